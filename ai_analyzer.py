@@ -1,16 +1,48 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
 import logging
 from datetime import datetime
+from functools import lru_cache
+from typing import Iterator
 
-logger = logging.getLogger(__name__)
+import pandas as pd
 
-try:
-    from mistralai import Mistral
+from utils import count_matrix, count_values
 
-    MISTRAL_SDK_AVAILABLE = True
-except ImportError:
-    MISTRAL_SDK_AVAILABLE = False
+logger = logging.getLogger(__name__)
 
-import pandas as pd
+MISTRAL_SERVER_URL = os.environ.get(
+    "MISTRAL_SERVER_URL", "https://api.mistral.ai"
+).rstrip("/")
+MISTRAL_MODEL = "mistral-large-latest"
+MISTRAL_PARAMS = {"temperature": 0.3, "max_tokens": 2000}
+CONTEXT_VERSION = 2
+CONTEXT_TOKEN_BUDGET = 3000
+CHARS_PER_TOKEN = 4
+DIGEST_TOP_K = 10
+DIGEST_MAX_MONTHS = 36
+DELTA_MONTHS = 3
+DIGEST_LABELS = {
+    "product_category": "catégories de produits",
+    "origin": "pays d'origine",
+    "fraud_type": "types de fraude",
+    "fraud_category": "catégories de fraude",
+    "notified_by": "pays notifiants",
+}
+DIGEST_CROSSTABS = [
+    ("product_category", "fraud_category", 8, 6),
+    ("origin", "product_category", 8, 4),
+]
+SAMPLE_COLUMNS = ["date", "product_category", "commodity", "origin", "fraud_type"]
+SAMPLE_ISSUE_CHARS = 160
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), "data", "ai_cache.sqlite")
+CACHE_TTL = 7 * 24 * 3600
+CACHE_MAX_ENTRIES = 500
 
 SYSTEM_PROMPT = """Vous êtes un expert en analyse des fraudes alimentaires pour la Commission Européenne.
 Analysez les données fournies sur les suspicions de fraude et répondez à la question de manière précise et détaillée.
@@ -19,53 +51,292 @@ Structurez votre réponse de manière claire avec des sections et des points cl
 Utilisez le formatage Markdown pour mettre en valeur les éléments importants."""
 
 
-def analyze_with_mistral(
-    api_key: str,
+@lru_cache(maxsize=None)
+def _mistral_client_class():
+    try:
+        from mistralai import Mistral
+    except ImportError:
+        try:
+            from mistralai.client import Mistral
+        except ImportError:
+            return None
+    return Mistral
+
+
+def _normalize_question(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().casefold()
+
+
+def data_fingerprint(data: pd.DataFrame) -> str:
+    hashed = pd.util.hash_pandas_object(data, index=False).values
+    digest = hashlib.sha256(hashed.tobytes())
+    digest.update(",".join(map(str, data.columns)).encode())
+    return digest.hexdigest()
+
+
+def cache_key(
     query: str,
     data: pd.DataFrame,
     conversation_history: list | None = None,
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
 ) -> str:
-    if not api_key or not query:
-        return "Veuillez fournir une clé API et une question pour l'analyse."
-    if data is None or data.empty:
-        return "Aucune donnée disponible pour l'analyse."
+    payload = {
+        "question": _normalize_question(query),
+        "data": data_fingerprint(data),
+        "history": [[m["role"], m["content"]] for m in (conversation_history or [])],
+        "model": MISTRAL_MODEL,
+        "params": MISTRAL_PARAMS,
+        "system": SYSTEM_PROMPT,
+        "context_version": CONTEXT_VERSION,
+        "token_budget": token_budget,
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
 
-    data_sample = data.sample(min(100, len(data))).to_json(
-        orient="records", force_ascii=False
-    )
-    total_records = len(data)
-    top_categories = (
-        data["product_category"].value_counts().nlargest(5).to_dict()
-        if "product_category" in data.columns
-        else {}
-    )
-    top_origins = (
-        data["origin"].value_counts().nlargest(5).to_dict()
-        if "origin" in data.columns
-        else {}
-    )
-    top_fraud_types = (
-        data["fraud_type"].value_counts().to_dict()
-        if "fraud_type" in data.columns
-        else {}
-    )
-    date_range = (
-        f"{data['date'].min()} à {data['date'].max()}"
-        if "date" in data.columns
-        else "non disponible"
+
+def _cache_connect(cache_path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    conn = sqlite3.connect(cache_path, timeout=5)
+    conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        )""")
+    return conn
+
+
+def cache_get(key: str, cache_path: str | None = None) -> str | None:
+    try:
+        conn = _cache_connect(cache_path or CACHE_PATH)
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created_at >= ?",
+                (key, now - CACHE_TTL),
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE responses SET last_used = ? WHERE key = ?", (now, key)
+                )
+                conn.commit()
+            return row[0] if row else None
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("Cache IA illisible: %s", e)
+        return None
+
+
+def cache_put(key: str, response: str, cache_path: str | None = None) -> None:
+    try:
+        conn = _cache_connect(cache_path or CACHE_PATH)
+        try:
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - CACHE_TTL,)
+            )
+            conn.execute(
+                """DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_used DESC
+                    LIMIT -1 OFFSET ?
+                )""",
+                (CACHE_MAX_ENTRIES,),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("Écriture impossible dans le cache IA: %s", e)
+
+
+def clear_cache(cache_path: str | None = None) -> None:
+    try:
+        conn = _cache_connect(cache_path or CACHE_PATH)
+        try:
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("Impossible de vider le cache IA: %s", e)
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _format_counts(counts: pd.Series) -> str:
+    return ", ".join(f"{label} ({count})" for label, count in counts.items())
+
+
+def _overview_section(data: pd.DataFrame) -> str:
+    lines = [f"Nombre total de suspicions: {len(data)}"]
+    if "date" in data.columns:
+        lines.append(f"Période couverte: {data['date'].min()} à {data['date'].max()}")
+    distinct = [
+        f"{label} {data[column].nunique()}"
+        for column, label in DIGEST_LABELS.items()
+        if column in data.columns
+    ]
+    if distinct:
+        lines.append("Valeurs distinctes: " + ", ".join(distinct))
+    return "\n".join(lines)
+
+
+def _period_section(data: pd.DataFrame) -> str:
+    if "date" not in data.columns:
+        return ""
+    months = count_values(data["date"]).sort_index()
+    if months.empty:
+        return ""
+    if len(months) <= DIGEST_MAX_MONTHS:
+        return "Suspicions par mois: " + ", ".join(
+            f"{month}: {count}" for month, count in months.items()
+        )
+    years = months.groupby(months.index.str[:4]).sum()
+    return "\n".join(
+        [
+            "Suspicions par année: "
+            + ", ".join(f"{year}: {count}" for year, count in years.items()),
+            "12 derniers mois: "
+            + ", ".join(f"{month}: {count}" for month, count in months[-12:].items()),
+        ]
     )
 
+
+def _format_change(recent: int, previous: int) -> str:
+    if not previous:
+        return f"{recent} vs 0"
+    return f"{recent} vs {previous}, {(recent - previous) / previous:+.0%}"
+
+
+def _delta_section(data: pd.DataFrame, top_k: int = DIGEST_TOP_K) -> str:
+    if "date" not in data.columns:
+        return ""
+    months = sorted(count_values(data["date"]).index)
+    window = min(DELTA_MONTHS, len(months) // 2)
+    if not window:
+        return ""
+    recent = data[data["date"].isin(months[-window:])]
+    previous = data[data["date"].isin(months[-2 * window : -window])]
+    lines = [
+        f"Évolution {months[-window]}–{months[-1]} vs "
+        f"{months[-2 * window]}–{months[-window - 1]}: "
+        f"total {_format_change(len(recent), len(previous))}"
+    ]
+    for column in ["product_category", "origin", "fraud_category"]:
+        if column not in data.columns:
+            continue
+        counts = pd.concat(
+            [count_values(recent[column]), count_values(previous[column])],
+            axis=1,
+            keys=["recent", "previous"],
+        ).fillna(0)
+        change = (counts["recent"] - counts["previous"]).abs()
+        movers = change[change > 0].sort_values(ascending=False, kind="stable")
+        if movers.empty:
+            continue
+        lines.append(
+            f"Plus fortes variations ({DIGEST_LABELS[column]}): "
+            + ", ".join(
+                f"{label} ({_format_change(int(counts.at[label, 'recent']), int(counts.at[label, 'previous']))})"
+                for label in movers.index[: top_k // 2]
+            )
+        )
+    return "\n".join(lines)
+
+
+def _top_section(data: pd.DataFrame, top_k: int = DIGEST_TOP_K) -> str:
+    lines = []
+    for column, label in DIGEST_LABELS.items():
+        if column in data.columns:
+            counts = count_values(data[column], top_k)
+            if not counts.empty:
+                lines.append(f"Top {label}: {_format_counts(counts)}")
+    return "\n".join(lines)
+
+
+def _crosstab_section(data: pd.DataFrame) -> str:
+    lines = []
+    for rows, cols, top_rows, top_cols in DIGEST_CROSSTABS:
+        if rows not in data.columns or cols not in data.columns:
+            continue
+        matrix = count_matrix(data[rows], data[cols], top_rows, top_cols)
+        if matrix.empty:
+            continue
+        lines.append(f"Croisement {DIGEST_LABELS[rows]} × {DIGEST_LABELS[cols]}:")
+        for label, counts in matrix.iterrows():
+            lines.append(f"- {label}: {_format_counts(counts[counts > 0])}")
+    return "\n".join(lines)
+
+
+def _stratified_order(data: pd.DataFrame) -> pd.DataFrame:
+    ordered = data
+    if "date" in data.columns:
+        ordered = data.sort_values("date", ascending=False, kind="stable")
+    if "product_category" not in data.columns:
+        return ordered
+    strata = ordered["product_category"].fillna("")
+    rank = ordered.groupby(strata, sort=False).cumcount()
+    size = strata.map(strata.value_counts())
+    position = (rank + 0.5) / size
+    return ordered.iloc[position.to_numpy().argsort(kind="stable")]
+
+
+def _sample_line(row: pd.Series) -> str:
+    fields = [str(row.get(column, "") or "") for column in SAMPLE_COLUMNS]
+    issue = " ".join(str(row.get("issue", "") or "").split())
+    if len(issue) > SAMPLE_ISSUE_CHARS:
+        issue = issue[: SAMPLE_ISSUE_CHARS - 1] + "…"
+    return " | ".join(fields + [issue])
+
+
+def build_context(data: pd.DataFrame, token_budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    parts = []
+    used = 0
+    for section in [
+        _overview_section(data),
+        _period_section(data),
+        _delta_section(data),
+        _top_section(data),
+        _crosstab_section(data),
+    ]:
+        cost = estimate_tokens(section) + 1
+        if section and used + cost <= token_budget:
+            parts.append(section)
+            used += cost
+
+    header = "Échantillon stratifié par catégorie (date | catégorie | produit | origine | type de fraude | description):"
+    used += estimate_tokens(header) + 1
+    lines = []
+    for _, row in _stratified_order(data).iterrows():
+        line = _sample_line(row)
+        cost = estimate_tokens(line) + 1
+        if used + cost > token_budget:
+            break
+        lines.append(line)
+        used += cost
+    if lines:
+        parts.append("\n".join([header] + lines))
+    return "\n\n".join(parts)
+
+
+def _build_messages(
+    query: str,
+    data: pd.DataFrame,
+    conversation_history: list | None,
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+) -> list[dict]:
     prompt = f"""Question: {query}
 
-Contexte des données analysées:
-- Nombre total de suspicions: {total_records}
-- Période couverte: {date_range}
-- Principales catégories de produits concernées: {top_categories}
-- Principaux pays d'origine: {top_origins}
-- Types de fraude: {top_fraud_types}
+Contexte des données analysées (synthèse des {len(data)} suspicions filtrées):
 
-Échantillon de données (limité à 100 enregistrements maximum):
-{data_sample}
+{build_context(data, token_budget)}
 
 Veuillez fournir une analyse détaillée qui répond spécifiquement à la question posée."""
 
@@ -73,38 +344,168 @@ Veuillez fournir une analyse détaillée qui répond spécifiquement à la quest
     if conversation_history:
         messages.extend(conversation_history)
     messages.append({"role": "user", "content": prompt})
+    return messages
 
-    try:
-        if MISTRAL_SDK_AVAILABLE:
-            client = Mistral(api_key=api_key)
-            response = client.chat.complete(
-                model="mistral-large-latest",
-                messages=messages,
-                temperature=0.3,
-                max_tokens=2000,
-            )
-            return response.choices[0].message.content
-        else:
-            import requests
-
-            resp = requests.post(
-                "https://api.mistral.ai/v1/chat/completions",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {api_key}",
-                },
-                json={
-                    "model": "mistral-large-latest",
-                    "messages": messages,
-                    "temperature": 0.3,
-                    "max_tokens": 2000,
-                },
-                timeout=60,
+
+def _headers(api_key: str) -> dict:
+    return {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
+
+
+def _complete(api_key: str, messages: list[dict]) -> str:
+    Mistral = _mistral_client_class()
+    if Mistral is not None:
+        client = Mistral(api_key=api_key, server_url=MISTRAL_SERVER_URL)
+        response = client.chat.complete(
+            model=MISTRAL_MODEL, messages=messages, **MISTRAL_PARAMS
+        )
+        return response.choices[0].message.content
+
+    import requests
+
+    resp = requests.post(
+        f"{MISTRAL_SERVER_URL}/v1/chat/completions",
+        headers=_headers(api_key),
+        json={"model": MISTRAL_MODEL, "messages": messages, **MISTRAL_PARAMS},
+        timeout=60,
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(
+            f"Erreur API Mistral ({resp.status_code}): {resp.text[:200]}"
+        )
+    return resp.json()["choices"][0]["message"]["content"]
+
+
+def _stream(api_key: str, messages: list[dict]) -> Iterator[str]:
+    Mistral = _mistral_client_class()
+    if Mistral is not None:
+        client = Mistral(api_key=api_key, server_url=MISTRAL_SERVER_URL)
+        with client.chat.stream(
+            model=MISTRAL_MODEL, messages=messages, **MISTRAL_PARAMS
+        ) as events:
+            for event in events:
+                if not event.data.choices:
+                    continue
+                content = event.data.choices[0].delta.content
+                if isinstance(content, str) and content:
+                    yield content
+        return
+
+    import requests
+
+    with requests.post(
+        f"{MISTRAL_SERVER_URL}/v1/chat/completions",
+        headers=_headers(api_key),
+        json={
+            "model": MISTRAL_MODEL,
+            "messages": messages,
+            "stream": True,
+            **MISTRAL_PARAMS,
+        },
+        stream=True,
+        timeout=60,
+    ) as resp:
+        if resp.status_code != 200:
+            raise RuntimeError(
+                f"Erreur API Mistral ({resp.status_code}): {resp.text[:200]}"
             )
-            if resp.status_code == 200:
-                return resp.json()["choices"][0]["message"]["content"]
-            else:
-                return f"Erreur API Mistral ({resp.status_code}): {resp.text[:200]}"
+        for raw in resp.iter_lines():
+            line = raw.decode("utf-8")
+            if not line.startswith("data:"):
+                continue
+            payload = line[len("data:") :].strip()
+            if payload == "[DONE]":
+                break
+            choices = json.loads(payload).get("choices")
+            if not choices:
+                continue
+            content = choices[0].get("delta", {}).get("content")
+            if content:
+                yield content
+
+
+def _input_error(api_key: str, query: str, data: pd.DataFrame) -> str | None:
+    if not api_key or not query:
+        return "Veuillez fournir une clé API et une question pour l'analyse."
+    if data is None or data.empty:
+        return "Aucune donnée disponible pour l'analyse."
+    return None
+
+
+def _cached_answer(key: str | None) -> str | None:
+    cached = cache_get(key) if key else None
+    if cached is not None:
+        logger.info("Réponse IA servie depuis le cache (%s)", key[:12])
+    return cached
+
+
+def analyze_with_mistral(
+    api_key: str,
+    query: str,
+    data: pd.DataFrame,
+    conversation_history: list | None = None,
+    use_cache: bool = True,
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+) -> str:
+    error = _input_error(api_key, query, data)
+    if error:
+        return error
+
+    key = (
+        cache_key(query, data, conversation_history, token_budget)
+        if use_cache
+        else None
+    )
+    cached = _cached_answer(key)
+    if cached is not None:
+        return cached
+
+    messages = _build_messages(query, data, conversation_history, token_budget)
+    try:
+        answer = _complete(api_key, messages)
     except Exception as e:
         logger.error("Erreur analyse IA: %s", e)
         return f"Erreur lors de l'analyse IA: {e}"
+
+    if key and answer:
+        cache_put(key, answer)
+    return answer
+
+
+def stream_with_mistral(
+    api_key: str,
+    query: str,
+    data: pd.DataFrame,
+    conversation_history: list | None = None,
+    use_cache: bool = True,
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+) -> Iterator[str]:
+    error = _input_error(api_key, query, data)
+    if error:
+        raise ValueError(error)
+
+    key = (
+        cache_key(query, data, conversation_history, token_budget)
+        if use_cache
+        else None
+    )
+    cached = _cached_answer(key)
+    if cached is not None:
+        yield cached
+        return
+
+    messages = _build_messages(query, data, conversation_history, token_budget)
+    parts = []
+    try:
+        for chunk in _stream(api_key, messages):
+            parts.append(chunk)
+            yield chunk
+    except Exception as e:
+        logger.error("Erreur analyse IA: %s", e)
+        raise RuntimeError(f"Erreur lors de l'analyse IA: {e}") from e
+
+    answer = "".join(parts)
+    if key and answer:
+        cache_put(key, answer)
@@ -1,5 +1,6 @@
 import streamlit as st
-from db_adapter import DataManager
+import jobs
+import warmup
 from pdf_processor import check_for_new_report, force_download_latest_report
 from datetime import datetime
 
@@ -10,9 +11,10 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+warmup.start()
 if "data_manager" not in st.session_state:
     with st.spinner("Chargement des données..."):
-        st.session_state.data_manager = DataManager()
+        st.session_state.data_manager = warmup.get_data_manager()
 
 if "last_update_check" not in st.session_state:
     st.session_state.last_update_check = None
@@ -23,6 +25,48 @@ if "filters" not in st.session_state:
 
 dm = st.session_state.data_manager
 
+JOB_OUTCOMES = {
+    "check_new_report": (
+        ("success", "Nouveau rapport ajouté !"),
+        ("info", "Aucun nouveau rapport disponible."),
+    ),
+    "force_download": (
+        ("success", "Rapport téléchargé et extrait !"),
+        ("error", "Échec du téléchargement."),
+    ),
+}
+
+
+def _start_job(key: str, label: str, func) -> None:
+    st.session_state.sidebar_job = jobs.submit(key, label, func, dm)
+
+
+@st.fragment(run_every=1)
+def _job_panel() -> None:
+    job = st.session_state.sidebar_job
+    if not job.done:
+        st.progress(job.progress, text=job.message)
+        return
+    if job.status == jobs.FAILED:
+        st.session_state.job_outcome = ("error", f"Erreur: {job.error}")
+    else:
+        success, failure = JOB_OUTCOMES[job.key]
+        st.session_state.job_outcome = success if job.result else failure
+    if job.key == "check_new_report":
+        st.session_state.last_update_check = datetime.now()
+    del st.session_state.sidebar_job
+    st.rerun(scope="app")
+
+
+def _job_feedback() -> None:
+    if "sidebar_job" in st.session_state:
+        _job_panel()
+    outcome = st.session_state.pop("job_outcome", None)
+    if outcome:
+        kind, text = outcome
+        getattr(st, kind)(text)
+
+
 dashboard = st.Page("pages/dashboard.py", title="Tableau de bord", icon="📊")
 geo = st.Page("pages/geo_analysis.py", title="Analyse géographique", icon="🌍")
 trends = st.Page("pages/trends.py", title="Tendances", icon="📈")
@@ -116,29 +160,17 @@ with st.sidebar:
                 use_container_width=True,
                 icon="🔄",
             ):
-                with st.spinner("Vérification en cours..."):
-                    try:
-                        result = check_for_new_report(dm)
-                        dm.reload()
-                        if result:
-                            st.success("Nouveau rapport ajouté !")
-                        else:
-                            st.info("Aucun nouveau rapport disponible.")
-                        st.session_state.last_update_check = datetime.now()
-                    except Exception as e:
-                        st.error(f"Erreur: {e}")
+                _start_job(
+                    "check_new_report",
+                    "Vérification en cours",
+                    check_for_new_report,
+                )
         with col2:
             if st.button("Forcer mise à jour PDF", use_container_width=True, icon="📥"):
-                with st.spinner("Téléchargement..."):
-                    try:
-                        if force_download_latest_report(dm):
-                            st.success("Rapport téléchargé et extrait !")
-                            dm.reload()
-                            st.rerun()
-                        else:
-                            st.error("Échec du téléchargement.")
-                    except Exception as e:
-                        st.error(f"Erreur: {e}")
+                _start_job(
+                    "force_download", "Téléchargement", force_download_latest_report
+                )
+        _job_feedback()
 
         if st.session_state.last_update_check:
             st.caption(
@@ -150,16 +182,8 @@ with st.sidebar:
             "Aucune donnée. Cliquez sur 'Forcer mise à jour PDF' pour télécharger le dernier rapport."
         )
         if st.button("Forcer mise à jour PDF", icon="📥"):
-            with st.spinner("Téléchargement..."):
-                try:
-                    if force_download_latest_report(dm):
-                        dm.reload()
-                        st.success("Rapport téléchargé ! Redémarrage...")
-                        st.rerun()
-                    else:
-                        st.error("Échec.")
-                except Exception as e:
-                    st.error(f"Erreur: {e}")
+            _start_job("force_download", "Téléchargement", force_download_latest_report)
+        _job_feedback()
 
         st.session_state.filters = {
             "start_date": None,
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Banc d'essai de l'extraction PDF : débit, mémoire crête et rappel sur un corpus synthétique."""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_report import generate_report
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+ENGINES = ["auto", "pypdf2", "pdfplumber"]
+CORPUS_SIZES = [60, 300, 1200]
+FIELDS = [
+    "fraud_type",
+    "classification",
+    "product_category",
+    "commodity",
+    "issue",
+    "origin",
+    "notified_by",
+]
+
+
+def _run_worker(engine: str, pdf_path: str) -> None:
+    from pdf_processor import extract_data_from_pdf
+
+    started = time.perf_counter()
+    result = extract_data_from_pdf(pdf_path, engine=engine)
+    seconds = time.perf_counter() - started
+    json.dump(
+        {
+            "seconds": seconds,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "page_count": result.get("page_count", 0),
+            "method": result.get("method", ""),
+            "announced": result.get("total_suspicions", 0),
+            "suspicions": result.get("suspicions", []),
+        },
+        sys.stdout,
+    )
+
+
+def _row_key(row: dict) -> tuple:
+    return tuple(row.get(field, "") for field in FIELDS)
+
+
+def _score(extracted: list[dict], truth: list[dict]) -> tuple[float, float]:
+    expected = Counter(_row_key(r) for r in truth)
+    found = Counter(_row_key(r) for r in extracted)
+    matched = sum((expected & found).values())
+    recall = matched / len(truth) if truth else 0.0
+    precision = matched / len(extracted) if extracted else 0.0
+    return recall, precision
+
+
+def build_corpus(corpus_dir: str, sizes: list[int]) -> list[tuple[str, list[dict]]]:
+    corpus = []
+    for i, size in enumerate(sizes):
+        pdf_path = os.path.join(corpus_dir, f"synthetic_{size}.pdf")
+        truth = generate_report(pdf_path, n_suspicions=size, month=i % 12 + 1, seed=i)
+        corpus.append((pdf_path, truth))
+    return corpus
+
+
+def run_benchmark(corpus: list, engines: list[str], repeat: int) -> list[dict]:
+    runs = []
+    for engine in engines:
+        for pdf_path, truth in corpus:
+            for attempt in range(repeat):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--worker", engine, pdf_path],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                measure = json.loads(output)
+                recall, precision = _score(measure.pop("suspicions"), truth)
+                seconds = measure["seconds"]
+                runs.append(
+                    {
+                        "engine": engine,
+                        "file": os.path.basename(pdf_path),
+                        "attempt": attempt,
+                        "truth": len(truth),
+                        "pages_per_sec": (
+                            measure["page_count"] / seconds if seconds > 0 else 0.0
+                        ),
+                        "recall": recall,
+                        "precision": precision,
+                        **measure,
+                    }
+                )
+    return runs
+
+
+def summarize(runs: list[dict]) -> dict:
+    summary = {}
+    for engine in sorted(set(r["engine"] for r in runs)):
+        engine_runs = [r for r in runs if r["engine"] == engine]
+        pages = sum(r["page_count"] for r in engine_runs)
+        seconds = sum(r["seconds"] for r in engine_runs)
+        truth = sum(r["truth"] for r in engine_runs)
+        summary[engine] = {
+            "pages_per_sec": round(pages / seconds, 2) if seconds > 0 else 0.0,
+            "peak_rss_mb": round(max(r["peak_rss_mb"] for r in engine_runs), 1),
+            "recall": round(
+                sum(r["recall"] * r["truth"] for r in engine_runs) / truth, 4
+            ),
+            "precision": round(
+                sum(r["precision"] * r["truth"] for r in engine_runs) / truth, 4
+            ),
+        }
+    return summary
+
+
+def _print_summary(summary: dict, baseline: dict | None) -> None:
+    print(
+        f"{'Moteur':<12} {'Pages/s':>10} {'RSS Mo':>8} {'Rappel':>8} {'Précision':>10}"
+    )
+    for engine, stats in summary.items():
+        line = (
+            f"{engine:<12} {stats['pages_per_sec']:>10.2f} {stats['peak_rss_mb']:>8.1f} "
+            f"{stats['recall']:>8.2%} {stats['precision']:>10.2%}"
+        )
+        previous = (baseline or {}).get(engine)
+        if previous and previous["pages_per_sec"]:
+            ratio = stats["pages_per_sec"] / previous["pages_per_sec"]
+            line += f"   débit x{ratio:.2f}, rappel {stats['recall'] - previous['recall']:+.2%}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=CORPUS_SIZES)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    parser.add_argument("--compare", help="Résultats JSON d'un run précédent")
+    parser.add_argument(
+        "--worker", nargs=2, metavar=("ENGINE", "PDF"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.worker:
+        _run_worker(*args.worker)
+        return
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        corpus = build_corpus(corpus_dir, args.sizes)
+        runs = run_benchmark(corpus, args.engines, args.repeat)
+
+    summary = summarize(runs)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f).get("summary")
+    _print_summary(summary, baseline)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"extraction_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": sys.version.split()[0],
+                "sizes": args.sizes,
+                "repeat": args.repeat,
+                "summary": summary,
+                "runs": runs,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    print(f"Résultats: {output}")
+
+
+if __name__ == "__main__":
+    main()
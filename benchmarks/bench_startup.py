@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Banc d'essai du démarrage à froid : imports (-X importtime) et temps jusqu'au premier rendu."""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+\d+ \|\s+(\S+)")
+WATCHED_PACKAGES = [
+    "plotly",
+    "pdfplumber",
+    "pdfminer",
+    "pypdfium2",
+    "PyPDF2",
+    "requests",
+    "urllib3",
+    "bs4",
+    "mistralai",
+    "openpyxl",
+    "pyarrow",
+]
+
+
+def _run_worker(app_root: str) -> None:
+    from streamlit.testing.v1 import AppTest
+
+    sys.path.insert(0, app_root)
+    started = time.perf_counter()
+    at = AppTest.from_file(os.path.join(app_root, "app.py"), default_timeout=300)
+    at.run()
+    json.dump(
+        {
+            "first_render_s": time.perf_counter() - started,
+            "exceptions": [e.message for e in at.exception],
+        },
+        sys.stdout,
+    )
+
+
+def _parse_importtime(stderr: str) -> dict[str, float]:
+    imports = {}
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            package = match.group(2).split(".")[0]
+            imports[package] = imports.get(package, 0.0) + int(match.group(1)) / 1000
+    return imports
+
+
+def measure(app_root: str) -> dict:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", __file__, "--worker", app_root],
+        capture_output=True,
+        text=True,
+        cwd=app_root,
+        check=True,
+    )
+    process_s = time.perf_counter() - started
+    run = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = _parse_importtime(proc.stderr)
+    return {
+        "process_s": process_s,
+        "first_render_s": run["first_render_s"],
+        "exceptions": run["exceptions"],
+        "import_ms": imports,
+    }
+
+
+def run_benchmark(app_root: str, repeat: int) -> dict:
+    measure(app_root)
+    runs = [measure(app_root) for _ in range(repeat)]
+    packages = {}
+    for name in WATCHED_PACKAGES:
+        loaded = [r["import_ms"][name] for r in runs if name in r["import_ms"]]
+        packages[name] = round(statistics.median(loaded), 1) if loaded else 0.0
+    return {
+        "process_s": round(statistics.median(r["process_s"] for r in runs), 3),
+        "first_render_s": round(
+            statistics.median(r["first_render_s"] for r in runs), 3
+        ),
+        "import_ms": packages,
+        "exceptions": runs[-1]["exceptions"],
+        "runs": runs,
+    }
+
+
+def _checkout(rev: str, target: str) -> None:
+    subprocess.run(
+        ["git", "-C", ROOT, "worktree", "add", "--detach", target, rev],
+        capture_output=True,
+        check=True,
+    )
+
+
+def _remove_checkout(target: str) -> None:
+    subprocess.run(
+        ["git", "-C", ROOT, "worktree", "remove", "--force", target],
+        capture_output=True,
+    )
+
+
+def _print_summary(label: str, result: dict, baseline: dict | None) -> None:
+    line = (
+        f"{label:<10} premier rendu {result['first_render_s']:>6.2f}s   "
+        f"processus {result['process_s']:>6.2f}s"
+    )
+    if baseline and result["first_render_s"]:
+        ratio = baseline["first_render_s"] / result["first_render_s"]
+        line += f"   x{ratio:.2f} vs référence"
+    print(line)
+    loaded = {k: v for k, v in result["import_ms"].items() if v}
+    print(
+        "           imports: "
+        + (", ".join(f"{k} {v:.0f}ms" for k, v in loaded.items()) or "aucun")
+    )
+    if result["exceptions"]:
+        print(f"           exceptions: {result['exceptions']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--baseline", help="Révision git à mesurer en référence (ex: HEAD~1)"
+    )
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    parser.add_argument("--worker", metavar="APP_ROOT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _run_worker(args.worker)
+        return
+
+    baseline = None
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            target = os.path.join(tmp, "baseline")
+            _checkout(args.baseline, target)
+            try:
+                baseline = run_benchmark(target, args.repeat)
+            finally:
+                _remove_checkout(target)
+        _print_summary(args.baseline, baseline, None)
+
+    current = run_benchmark(ROOT, args.repeat)
+    _print_summary("actuel", current, baseline)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"startup_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": sys.version.split()[0],
+                "repeat": args.repeat,
+                "baseline_rev": args.baseline,
+                "baseline": baseline,
+                "current": current,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    print(f"Résultats: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""Générateur de rapports PDF synthétiques au format mensuel UE (Food Fraud Network)."""
+
+import os
+import sys
+import json
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_processor import EXPECTED_HEADERS
+
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+MARGIN_TOP = 40
+MARGIN_BOTTOM = 40
+FONT_SIZE = 7
+LINE_HEIGHT = 9
+CELL_PADDING = 3
+COLUMN_EDGES = [30, 150, 250, 340, 560, 680, 812]
+
+SECTIONS = [
+    (
+        "1. PRODUCT TAMPERING",
+        "Product tampering",
+        [
+            "Additives not compliant with EU MLs",
+            "Unauthorised substances",
+            "Dilution / substitution",
+        ],
+    ),
+    (
+        "2. RECORD TAMPERING",
+        "Record tampering",
+        [
+            "Falsified health certificate",
+            "Mislabelling of origin",
+            "Expired date tampering",
+        ],
+    ),
+    (
+        "3. OTHER NON-COMPLIANCES",
+        "Other non-compliances",
+        [
+            "Illegal trade",
+            "Unapproved establishment",
+            "Missing traceability documents",
+        ],
+    ),
+]
+
+PRODUCT_CATEGORIES = [
+    "Cereals and bakery products",
+    "Fats and oils",
+    "Fish and fish products",
+    "Fruits and vegetables",
+    "Herbs and spices",
+    "Honey and royal jelly",
+    "Meat and meat products (other than poultry)",
+    "Milk and milk products",
+    "Nuts, nut products and seeds",
+    "Poultry meat and poultry meat products",
+]
+
+COMMODITIES = [
+    "olive oil",
+    "basmati rice",
+    "black pepper",
+    "saffron",
+    "acacia honey",
+    "tuna loins",
+    "minced beef",
+    "mozzarella cheese",
+    "pistachio kernels",
+    "chicken breast",
+    "paprika powder",
+    "sunflower oil",
+]
+
+ISSUES = [
+    "sudan dye (Sudan IV) detected in product labelled as pure spice",
+    "addition of undeclared sugar syrup",
+    "carbon monoxide treatment to preserve colour",
+    "falsified health certificate accompanying the consignment",
+    "origin declared as EU while product was imported from third country",
+    "illegal import without veterinary checks at border control post",
+    "expiry date relabelled after the original date had passed",
+    "substitution of species, declared as yellowfin tuna",
+    "undeclared addition of water and phosphates",
+    "mixture with lower quality oil not declared on the label",
+]
+
+COUNTRIES = [
+    "Albania",
+    "Brazil",
+    "China",
+    "Egypt",
+    "France",
+    "Germany",
+    "India",
+    "Italy",
+    "Morocco",
+    "Netherlands",
+    "Poland",
+    "Spain",
+    "Türkiye",
+    "Ukraine",
+    "Vietnam",
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: float) -> list[str]:
+    max_chars = max(int((width - 2 * CELL_PADDING) / (FONT_SIZE * 0.5)), 4)
+    lines, current = [], ""
+    for word in text.split():
+        candidate = f"{current} {word}".strip()
+        if len(candidate) <= max_chars:
+            current = candidate
+        else:
+            if current:
+                lines.append(current)
+            current = word
+    if current:
+        lines.append(current)
+    return lines or [""]
+
+
+class _Page:
+    def __init__(self):
+        self.ops = []
+
+    def text(self, x: float, y: float, text: str, size: int = FONT_SIZE) -> None:
+        self.ops.append(f"BT /F1 {size} Tf {x:.1f} {y:.1f} Td ({_escape(text)}) Tj ET")
+
+    def line(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        self.ops.append(f"{x1:.1f} {y1:.1f} m {x2:.1f} {y2:.1f} l S")
+
+    def content(self) -> bytes:
+        return ("0.5 w\n" + "\n".join(self.ops)).encode("latin-1", "replace")
+
+
+def _write_pdf(pages: list[_Page], path: str) -> None:
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        b"/Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for page in pages:
+        stream = page.content()
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        content_id = len(objects)
+        objects.append(
+            (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+            ).encode()
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def _generate_rows(rng: random.Random, section: tuple, n_rows: int) -> list[dict]:
+    _, fraud_type, classifications = section
+    rows = []
+    while len(rows) < n_rows:
+        classification = rng.choice(classifications)
+        for _ in range(rng.randint(1, 3)):
+            category = rng.choice(PRODUCT_CATEGORIES)
+            for _ in range(rng.randint(1, 4)):
+                if len(rows) >= n_rows:
+                    break
+                rows.append(
+                    {
+                        "fraud_type": fraud_type,
+                        "classification": classification,
+                        "product_category": category,
+                        "commodity": rng.choice(COMMODITIES),
+                        "issue": rng.choice(ISSUES),
+                        "origin": rng.choice(COUNTRIES),
+                        "notified_by": rng.choice(COUNTRIES),
+                    }
+                )
+    return rows
+
+
+def _draw_header(page: _Page, top: float) -> float:
+    height = 2 * LINE_HEIGHT + 2 * CELL_PADDING
+    for col, header in enumerate(EXPECTED_HEADERS):
+        x0, x1 = COLUMN_EDGES[col], COLUMN_EDGES[col + 1]
+        for i, text in enumerate(_wrap(header, x1 - x0)):
+            page.text(
+                x0 + CELL_PADDING, top - CELL_PADDING - (i + 1) * LINE_HEIGHT + 2, text
+            )
+    bottom = top - height
+    page.line(COLUMN_EDGES[0], top, COLUMN_EDGES[-1], top)
+    page.line(COLUMN_EDGES[0], bottom, COLUMN_EDGES[-1], bottom)
+    return bottom
+
+
+def _draw_table(pages: list[_Page], page: _Page, top: float, rows: list[dict]) -> tuple:
+    fields = [
+        "classification",
+        "product_category",
+        "commodity",
+        "issue",
+        "origin",
+        "notified_by",
+    ]
+    table_top = top
+    y = _draw_header(page, top)
+    previous = None
+    for row in rows:
+        cells = [
+            _wrap(row[f], COLUMN_EDGES[i + 1] - COLUMN_EDGES[i])
+            for i, f in enumerate(fields)
+        ]
+        height = max(len(c) for c in cells) * LINE_HEIGHT + 2 * CELL_PADDING
+        if y - height < MARGIN_BOTTOM:
+            for x in COLUMN_EDGES:
+                page.line(x, table_top, x, y)
+            page.line(COLUMN_EDGES[0], y, COLUMN_EDGES[-1], y)
+            page = _Page()
+            pages.append(page)
+            table_top = PAGE_HEIGHT - MARGIN_TOP
+            y = _draw_header(page, table_top)
+
+        merged = [
+            previous is not None
+            and previous["classification"] == row["classification"],
+            previous is not None
+            and previous["classification"] == row["classification"]
+            and previous["product_category"] == row["product_category"],
+        ]
+        for col, lines in enumerate(cells):
+            x0 = COLUMN_EDGES[col]
+            if col < 2 and merged[col]:
+                continue
+            if col < 2:
+                page.line(x0, y, COLUMN_EDGES[col + 1], y)
+            for i, text in enumerate(lines):
+                page.text(
+                    x0 + CELL_PADDING,
+                    y - CELL_PADDING - (i + 1) * LINE_HEIGHT + 2,
+                    text,
+                )
+        page.line(COLUMN_EDGES[2], y, COLUMN_EDGES[-1], y)
+        y -= height
+        previous = row
+
+    for x in COLUMN_EDGES:
+        page.line(x, table_top, x, y)
+    page.line(COLUMN_EDGES[0], y, COLUMN_EDGES[-1], y)
+    return page, y
+
+
+def generate_report(
+    path: str, n_suspicions: int = 60, year: int = 2026, month: int = 2, seed: int = 0
+) -> list[dict]:
+    rng = random.Random(seed)
+    months = [
+        "January",
+        "February",
+        "March",
+        "April",
+        "May",
+        "June",
+        "July",
+        "August",
+        "September",
+        "October",
+        "November",
+        "December",
+    ]
+
+    cover = _Page()
+    cover.text(60, 400, "EU Agri-Food Fraud Network", size=20)
+    cover.text(60, 370, f"Monthly report - {months[month - 1]} {year}", size=14)
+    summary = _Page()
+    summary.text(
+        60, 500, f"THIS MONTH {n_suspicions} SUSPICIONS WERE RETRIEVED", size=12
+    )
+    pages = [cover, summary]
+
+    split = sorted(rng.sample(range(1, n_suspicions), len(SECTIONS) - 1))
+    bounds = [0] + split + [n_suspicions]
+    ground_truth = []
+    for section, lo, hi in zip(SECTIONS, bounds, bounds[1:]):
+        rows = _generate_rows(rng, section, hi - lo)
+        page = _Page()
+        pages.append(page)
+        page.text(COLUMN_EDGES[0], PAGE_HEIGHT - MARGIN_TOP, section[0], size=12)
+        _draw_table(pages, page, PAGE_HEIGHT - MARGIN_TOP - 12, rows)
+        ground_truth.extend(rows)
+
+    for number, page in enumerate(pages, start=1):
+        page.text(PAGE_WIDTH - 80, MARGIN_BOTTOM / 2, f"Page {number}/{len(pages)}")
+    _write_pdf(pages, path)
+    return ground_truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output", help="Chemin du PDF à générer")
+    parser.add_argument("--suspicions", type=int, default=60)
+    parser.add_argument("--year", type=int, default=2026)
+    parser.add_argument("--month", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    truth = generate_report(
+        args.output, args.suspicions, args.year, args.month, args.seed
+    )
+    truth_path = os.path.splitext(args.output)[0] + ".truth.json"
+    with open(truth_path, "w", encoding="utf-8") as f:
+        json.dump(truth, f, ensure_ascii=False, indent=2)
+    print(f"{args.output}: {len(truth)} suspicions ({truth_path})")
+
+
+if __name__ == "__main__":
+    main()
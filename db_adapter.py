@@ -1,10 +1,32 @@
+import io
 import os
 import re
+import csv
 import glob
+import json
+import hashlib
+import shutil
+import queue
 import sqlite3
 import logging
+import tempfile
+import threading
 import pandas as pd
 from datetime import datetime
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from urllib.request import pathname2url
+
+from utils import (
+    categorize_fraud_issues,
+    count_matrix,
+    count_values,
+    country_codes,
+    label_codes,
+    log_unmapped_origins,
+    pivot_codes,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +34,7 @@ DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 EXTRACTED_DIR = os.path.join(DATA_DIR, "extracted")
 CSV_SOURCE = os.path.join(os.path.dirname(__file__), "VISIPILOT veille Food Fraud .csv")
 DB_PATH = os.path.join(DATA_DIR, "database.sqlite")
+GENERATION_FILE = os.path.join(DATA_DIR, "generation.json")
 
 SCHEMA_REPORTS = """
 CREATE TABLE IF NOT EXISTS reports (
@@ -37,6 +60,7 @@ CREATE TABLE IF NOT EXISTS suspicions (
     commodity TEXT,
     issue TEXT,
     origin TEXT,
+    origin_iso3 TEXT DEFAULT '',
     notified_by TEXT DEFAULT '',
     fraud_type TEXT,
     fraud_category TEXT DEFAULT '',
@@ -57,13 +81,66 @@ CREATE TABLE IF NOT EXISTS extraction_logs (
 )
 """
 
+SCHEMA_EXTRACTION_PAGE_LOGS = """
+CREATE TABLE IF NOT EXISTS extraction_page_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    log_id INTEGER NOT NULL,
+    page INTEGER,
+    engine TEXT,
+    text_ms REAL DEFAULT 0.0,
+    table_ms REAL DEFAULT 0.0,
+    tables INTEGER DEFAULT 0,
+    rows_kept INTEGER DEFAULT 0,
+    rows_dropped INTEGER DEFAULT 0,
+    fallback TEXT DEFAULT '',
+    FOREIGN KEY (log_id) REFERENCES extraction_logs(id)
+)
+"""
+
 INDEXES = [
     "CREATE INDEX IF NOT EXISTS idx_reports_ym ON reports(report_year, report_month)",
     "CREATE INDEX IF NOT EXISTS idx_suspicions_rid ON suspicions(report_id)",
     "CREATE INDEX IF NOT EXISTS idx_suspicions_cat ON suspicions(product_category)",
     "CREATE INDEX IF NOT EXISTS idx_suspicions_ft ON suspicions(fraud_type)",
     "CREATE INDEX IF NOT EXISTS idx_suspicions_origin ON suspicions(origin)",
+    "CREATE INDEX IF NOT EXISTS idx_suspicions_iso3 ON suspicions(origin_iso3)",
+    "CREATE INDEX IF NOT EXISTS idx_page_logs_lid ON extraction_page_logs(log_id)",
+]
+
+LOAD_QUERY = """
+SELECT s.*, r.report_date as date, r.report_year as year,
+       r.report_month as month, r.total_suspicions
+FROM suspicions s
+JOIN reports r ON s.report_id = r.id
+"""
+
+DETAIL_COLUMNS = {
+    "date": "r.report_date",
+    "origin": "s.origin",
+    "product_category": "s.product_category",
+    "commodity": "s.commodity",
+    "fraud_type": "s.fraud_type",
+    "issue": "s.issue",
+    "origin_iso3": "s.origin_iso3",
+    "link_source": "s.link_source",
+}
+EXPORT_COLUMNS = [
+    "date",
+    "origin",
+    "product_category",
+    "commodity",
+    "fraud_type",
+    "issue",
 ]
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+EXPORT_CHUNK_ROWS = 5000
+PIVOT_CACHE_SIZE = 32
+GENERATION_ATTR = "data_generation"
+
 
 MONTH_FR_TO_NUM = {
     "janv": 1,
@@ -95,6 +172,7 @@ def _init_db(db_path: str) -> None:
     c.execute(SCHEMA_REPORTS)
     c.execute(SCHEMA_SUSPICIONS)
     c.execute(SCHEMA_EXTRACTION_LOGS)
+    c.execute(SCHEMA_EXTRACTION_PAGE_LOGS)
     for idx in INDEXES:
         c.execute(idx)
     conn.commit()
@@ -109,59 +187,78 @@ def _parse_csv_month(mois_str: str) -> int:
     return MONTH_FR_TO_NUM.get(cleaned, 1)
 
 
-def _load_csv_source(csv_path: str) -> pd.DataFrame:
-    if not os.path.exists(csv_path):
-        logger.warning("CSV source introuvable: %s", csv_path)
-        return pd.DataFrame()
+CSV_SOURCE_COLUMNS = {
+    r"^ID$": "source_id",
+    r"Ann": "year",
+    r"Mois": "month_str",
+    r"Date": "date_raw",
+    r"Pays": "origin",
+    r"CATPROD": "product_category",
+    r"Produit": "commodity",
+    r"CATFRAU": "fraud_type",
+    r"OBJETFRAU": "issue",
+    r"LINKSOURCE": "link_source",
+}
+CSV_DATE_COLUMNS = {"year", "month_str", "date_raw"}
+
+
+def _csv_source_column(name: str) -> str | None:
+    cleaned = name.strip().lstrip("\ufeff").lstrip("ï»¿")
+    for pattern, target in CSV_SOURCE_COLUMNS.items():
+        if re.match(pattern, cleaned, re.IGNORECASE):
+            return target
+    return None
+
+
+def _read_csv_source(csv_path: str, usecols=None) -> pd.DataFrame:
     try:
-        df = pd.read_csv(csv_path, sep=";", encoding="latin-1")
+        df = pd.read_csv(csv_path, sep=";", encoding="latin-1", usecols=usecols)
     except Exception:
         try:
-            df = pd.read_csv(csv_path, sep=",", encoding="utf-8-sig")
+            df = pd.read_csv(csv_path, sep=",", encoding="utf-8-sig", usecols=usecols)
         except Exception as e:
             logger.error("Impossible de lire le CSV source: %s", e)
             return pd.DataFrame()
-
-    COL_PATTERNS = {
-        r"^ID$": "source_id",
-        r"Ann": "year",
-        r"Mois": "month_str",
-        r"Date": "date_raw",
-        r"Pays": "origin",
-        r"CATPROD": "product_category",
-        r"Produit": "commodity",
-        r"CATFRAU": "fraud_type",
-        r"OBJETFRAU": "issue",
-        r"LINKSOURCE": "link_source",
-    }
-    actual_rename = {}
+    rename = {}
     for col in df.columns:
-        cleaned_col = col.strip().lstrip("\ufeff")
-        for pattern, target in COL_PATTERNS.items():
-            if re.match(pattern, cleaned_col, re.IGNORECASE):
-                actual_rename[col] = target
-                break
-    df = df.rename(columns=actual_rename)
+        target = _csv_source_column(col)
+        if target:
+            rename[col] = target
+    return df.rename(columns=rename)
+
+
+def _csv_source_report_dates(
+    df: pd.DataFrame,
+) -> tuple[pd.Series | None, pd.Series | None]:
+    year = month = None
+    if "date_raw" in df.columns:
+        parsed = pd.to_datetime(df["date_raw"], format="%d/%m/%Y", errors="coerce")
+        if parsed.notna().any():
+            year = parsed.dt.year.astype("Int64")
+            month = parsed.dt.month.astype("Int64")
+    if year is None and "year" in df.columns:
+        year = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
+    if month is None and "month_str" in df.columns:
+        month = df["month_str"].apply(_parse_csv_month)
+    return year, month
+
+
+def _load_csv_source(csv_path: str) -> pd.DataFrame:
+    if not os.path.exists(csv_path):
+        logger.warning("CSV source introuvable: %s", csv_path)
+        return pd.DataFrame()
+    df = _read_csv_source(csv_path)
+    if df.empty:
+        return df
 
     drop_cols = [c for c in df.columns if c.startswith("Unnamed")]
     df = df.drop(columns=drop_cols, errors="ignore")
 
-    if "date_raw" in df.columns:
-        df["_parsed_year"] = pd.to_datetime(
-            df["date_raw"], format="%d/%m/%Y", errors="coerce"
-        ).dt.year
-        df["_parsed_month"] = pd.to_datetime(
-            df["date_raw"], format="%d/%m/%Y", errors="coerce"
-        ).dt.month
-
-    if "_parsed_year" in df.columns and df["_parsed_year"].notna().any():
-        df["report_year"] = df["_parsed_year"].astype("Int64")
-    elif "year" in df.columns:
-        df["report_year"] = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
-    if "_parsed_month" in df.columns and df["_parsed_month"].notna().any():
-        df["report_month"] = df["_parsed_month"].astype("Int64")
-    elif "month_str" in df.columns:
-        df["report_month"] = df["month_str"].apply(_parse_csv_month)
+    year, month = _csv_source_report_dates(df)
+    if year is not None:
+        df["report_year"] = year
+    if month is not None:
+        df["report_month"] = month
     if "report_year" in df.columns and "report_month" in df.columns:
         df["report_date"] = df.apply(
             lambda r: (
@@ -231,6 +328,249 @@ def _load_extracted_csvs(extracted_dir: str) -> pd.DataFrame:
     return combined
 
 
+def _valid_suspicions(suspicions: list[dict]) -> list[dict]:
+    return [
+        s
+        for s in suspicions
+        if s.get("product_category", "").strip() and s.get("issue", "").strip()
+    ]
+
+
+_csv_locks: dict[str, threading.Lock] = {}
+_csv_locks_guard = threading.Lock()
+
+
+def _csv_lock(csv_path: str) -> threading.Lock:
+    with _csv_locks_guard:
+        return _csv_locks.setdefault(os.path.abspath(csv_path), threading.Lock())
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _replace_text(path: str, text: str) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.chmod(tmp_path, 0o644)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _ingested_marker(csv_path: str) -> str:
+    directory, name = os.path.split(csv_path)
+    return os.path.join(directory, f".{name}.sha256")
+
+
+def mark_csv_ingested(csv_path: str, digest: str | None = None) -> None:
+    _replace_text(_ingested_marker(csv_path), digest or _file_digest(csv_path))
+
+
+def is_csv_ingested(csv_path: str) -> bool:
+    try:
+        with open(_ingested_marker(csv_path), encoding="utf-8") as f:
+            return f.read().strip() == _file_digest(csv_path)
+    except FileNotFoundError:
+        return False
+
+
+def write_report_csv(
+    report_date: str,
+    suspicions: list[dict],
+    extracted_dir: str | None = None,
+    ingested: bool = False,
+) -> str:
+    extracted_dir = extracted_dir or EXTRACTED_DIR
+    os.makedirs(extracted_dir, exist_ok=True)
+    csv_path = os.path.join(extracted_dir, f"report_{report_date}.csv")
+    with _csv_lock(csv_path):
+        fd, tmp_path = tempfile.mkstemp(dir=extracted_dir, suffix=".csv.tmp")
+        os.chmod(tmp_path, 0o644)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                pd.DataFrame(_valid_suspicions(suspicions)).to_csv(f, index=False)
+            if ingested:
+                mark_csv_ingested(csv_path, _file_digest(tmp_path))
+            os.replace(tmp_path, csv_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return csv_path
+
+
+def _migrate_schema(conn: sqlite3.Connection) -> None:
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(suspicions)")}
+    if "origin_iso3" not in columns:
+        conn.execute("ALTER TABLE suspicions ADD COLUMN origin_iso3 TEXT DEFAULT ''")
+
+
+def _store_report(
+    conn: sqlite3.Connection,
+    report_date: str,
+    file_path: str,
+    extracted_data: dict,
+    confidence_score: float,
+    extraction_method: str,
+) -> int:
+    c = conn.cursor()
+    date_obj = datetime.strptime(report_date, "%Y-%m")
+    year, month = date_obj.year, date_obj.month
+
+    c.execute(
+        "SELECT id FROM reports WHERE report_year = ? AND report_month = ?",
+        (year, month),
+    )
+    existing = c.fetchone()
+
+    valid_suspicions = _valid_suspicions(extracted_data.get("suspicions", []))
+    fraud_categories = categorize_fraud_issues(
+        pd.Series([susp.get("issue", "") for susp in valid_suspicions], dtype=object)
+    ).tolist()
+    origins = pd.Series(
+        [susp.get("origin", "") for susp in valid_suspicions], dtype=object
+    )
+    iso_codes = country_codes(origins)
+    log_unmapped_origins(origins, iso_codes)
+
+    if existing:
+        report_id = existing[0]
+        c.execute(
+            "UPDATE reports SET file_path=?, total_suspicions=?, confidence_score=?, extraction_method=?, date_added=? WHERE id=?",
+            (
+                file_path,
+                len(valid_suspicions),
+                confidence_score,
+                extraction_method,
+                datetime.now().isoformat(),
+                report_id,
+            ),
+        )
+        c.execute("DELETE FROM suspicions WHERE report_id = ?", (report_id,))
+    else:
+        c.execute(
+            "INSERT INTO reports (report_date, report_year, report_month, file_path, total_suspicions, confidence_score, extraction_method, date_added) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                report_date,
+                year,
+                month,
+                file_path,
+                len(valid_suspicions),
+                confidence_score,
+                extraction_method,
+                datetime.now().isoformat(),
+            ),
+        )
+        report_id = c.lastrowid
+
+    for susp, fraud_category, iso3 in zip(
+        valid_suspicions, fraud_categories, iso_codes
+    ):
+        c.execute(
+            "INSERT INTO suspicions (report_id, source_id, classification, product_category, commodity, issue, origin, origin_iso3, notified_by, fraud_type, fraud_category, link_source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                report_id,
+                susp.get("source_id", ""),
+                susp.get("classification", ""),
+                susp.get("product_category", ""),
+                susp.get("commodity", ""),
+                susp.get("issue", ""),
+                susp.get("origin", ""),
+                iso3,
+                susp.get("notified_by", ""),
+                susp.get("fraud_type", ""),
+                fraud_category,
+                susp.get("link_source", ""),
+            ),
+        )
+
+    c.execute(
+        "INSERT INTO extraction_logs (report_date, method, extracted_count, announced_count, confidence_score, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            report_date,
+            extraction_method,
+            len(valid_suspicions),
+            extracted_data.get("total_suspicions", 0),
+            confidence_score,
+            datetime.now().isoformat(),
+        ),
+    )
+    log_id = c.lastrowid
+    c.executemany(
+        "INSERT INTO extraction_page_logs (log_id, page, engine, text_ms, table_ms, tables, rows_kept, rows_dropped, fallback) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                log_id,
+                stats.get("page", 0),
+                stats.get("engine", extraction_method),
+                stats.get("text_ms", 0.0),
+                stats.get("table_ms", 0.0),
+                stats.get("tables", 0),
+                stats.get("rows_kept", 0),
+                stats.get("rows_dropped", 0),
+                stats.get("fallback", ""),
+            )
+            for stats in extracted_data.get("page_stats", [])
+        ],
+    )
+    return len(valid_suspicions)
+
+
+def read_generations(generation_file: str | None = None) -> dict:
+    try:
+        with open(generation_file or GENERATION_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"generation": 0, "partitions": {}}
+
+
+_generation_guard = threading.Lock()
+
+
+@contextmanager
+def _generation_lock(generation_file: str):
+    os.makedirs(os.path.dirname(os.path.abspath(generation_file)), exist_ok=True)
+    with _generation_guard, open(f"{generation_file}.lock", "a") as lock_file:
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def bump_generation(partitions: list[str], generation_file: str | None = None) -> dict:
+    generation_file = generation_file or GENERATION_FILE
+    with _generation_lock(generation_file):
+        state = read_generations(generation_file)
+        state["generation"] += 1
+        for partition in partitions:
+            state["partitions"][partition] = state["generation"]
+        _replace_text(generation_file, json.dumps(state, indent=2))
+    return state
+
+
+def read_report_csv(csv_path: str) -> list[dict]:
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
 def _rebuild_db_from_dataframes(db_path: str, *dataframes: pd.DataFrame) -> None:
     _init_db(db_path)
     conn = sqlite3.connect(db_path)
@@ -244,6 +584,9 @@ def _rebuild_db_from_dataframes(db_path: str, *dataframes: pd.DataFrame) -> None
         subset=["product_category", "commodity", "issue", "origin"],
         keep="last",
     )
+    combined["fraud_category"] = categorize_fraud_issues(combined["issue"])
+    combined["origin_iso3"] = country_codes(combined["origin"])
+    log_unmapped_origins(combined["origin"], combined["origin_iso3"])
     if "report_date" in combined.columns:
         for report_date in combined["report_date"].dropna().unique():
             report_data = combined[combined["report_date"] == report_date]
@@ -277,7 +620,7 @@ def _rebuild_db_from_dataframes(db_path: str, *dataframes: pd.DataFrame) -> None
                 report_id = c.lastrowid
             for _, row in report_data.iterrows():
                 c.execute(
-                    "INSERT INTO suspicions (report_id, source_id, classification, product_category, commodity, issue, origin, notified_by, fraud_type, fraud_category, link_source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    "INSERT INTO suspicions (report_id, source_id, classification, product_category, commodity, issue, origin, origin_iso3, notified_by, fraud_type, fraud_category, link_source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
                     (
                         report_id,
                         str(row.get("source_id", "")),
@@ -286,6 +629,7 @@ def _rebuild_db_from_dataframes(db_path: str, *dataframes: pd.DataFrame) -> None
                         str(row.get("commodity", "")),
                         str(row.get("issue", "")),
                         str(row.get("origin", "")),
+                        str(row.get("origin_iso3", "")),
                         str(row.get("notified_by", "")),
                         str(row.get("fraud_type", "")),
                         str(row.get("fraud_category", "")),
@@ -297,53 +641,676 @@ def _rebuild_db_from_dataframes(db_path: str, *dataframes: pd.DataFrame) -> None
     logger.info("Base reconstruite: %d entrées", len(combined))
 
 
+def _db_generation(db_path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+    return st.st_dev, st.st_ino
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _copy_extraction_logs(conn: sqlite3.Connection, previous_db: str) -> None:
+    if not os.path.exists(previous_db):
+        return
+    conn.execute("ATTACH DATABASE ? AS previous", (previous_db,))
+    try:
+        for table in ("extraction_logs", "extraction_page_logs"):
+            try:
+                conn.execute(f"INSERT INTO {table} SELECT * FROM previous.{table}")
+            except sqlite3.Error as e:
+                logger.warning("Historique %s non repris: %s", table, e)
+        conn.commit()
+    finally:
+        conn.execute("DETACH DATABASE previous")
+
+
+def _build_database(
+    db_path: str | None = None,
+    csv_source: str | None = None,
+    extracted_dir: str | None = None,
+) -> None:
+    db_path = db_path or DB_PATH
+    db_dir = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(db_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=db_dir, prefix=".database.", suffix=".sqlite.tmp"
+    )
+    os.close(fd)
+    os.chmod(tmp_path, 0o644)
+    try:
+        csv_df = _load_csv_source(csv_source or CSV_SOURCE)
+        extracted_df = _load_extracted_csvs(extracted_dir or EXTRACTED_DIR)
+        _rebuild_db_from_dataframes(tmp_path, csv_df, extracted_df)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            _copy_extraction_logs(conn, db_path)
+            conn.execute("ANALYZE")
+            conn.commit()
+        finally:
+            conn.close()
+        with open(tmp_path, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, db_path)
+        _fsync_dir(db_dir)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info("Nouvelle génération de base en place: %s", db_path)
+
+
+def _connect_readonly(db_path: str) -> sqlite3.Connection:
+    uri = f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+
+def _latest_db_date(db_path: str) -> tuple[int, int] | None:
+    if not os.path.exists(db_path):
+        return None
+    try:
+        conn = _connect_readonly(db_path)
+    except sqlite3.Error as e:
+        logger.warning("Base illisible en lecture seule: %s", e)
+        return None
+    try:
+        row = conn.execute(
+            "SELECT report_year, report_month FROM reports ORDER BY report_year DESC, report_month DESC LIMIT 1"
+        ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning("Lecture de la date en base impossible: %s", e)
+        row = None
+    finally:
+        conn.close()
+    return (row[0], row[1]) if row else None
+
+
+def _latest_extracted_date(extracted_dir: str) -> tuple[int, int] | None:
+    dates = []
+    for path in glob.glob(os.path.join(extracted_dir, "report_*.csv")):
+        match = re.match(r"report_(\d{4})-(\d{2})\.csv$", os.path.basename(path))
+        if match:
+            dates.append((int(match.group(1)), int(match.group(2))))
+    return max(dates) if dates else None
+
+
+def _latest_csv_source_date(csv_path: str) -> tuple[int, int] | None:
+    if not os.path.exists(csv_path):
+        return None
+    df = _read_csv_source(
+        csv_path, usecols=lambda c: _csv_source_column(c) in CSV_DATE_COLUMNS
+    )
+    year, month = _csv_source_report_dates(df)
+    if year is None:
+        return None
+    dates = pd.DataFrame({"year": year, "month": 1 if month is None else month})
+    dates = dates.dropna()
+    if dates.empty:
+        return None
+    latest = dates.sort_values(["year", "month"]).iloc[-1]
+    return int(latest["year"]), int(latest["month"])
+
+
+def _details_where(filters: dict) -> tuple[str, list]:
+    clauses, params = [], []
+    if filters.get("start_date") and filters.get("end_date"):
+        clauses.append("r.report_date BETWEEN ? AND ?")
+        params += [filters["start_date"], filters["end_date"]]
+    for key, column in [
+        ("categories", "s.product_category"),
+        ("fraud_types", "s.fraud_type"),
+        ("origins", "s.origin"),
+    ]:
+        values = filters.get(key)
+        if values:
+            clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params += list(values)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _details_query(
+    filters: dict, columns: list[str], sort_by: str | None, descending: bool
+) -> tuple[str, list]:
+    where, params = _details_where(filters)
+    select = ", ".join(f"{DETAIL_COLUMNS[c]} AS {c}" for c in columns)
+    order = "s.id"
+    if sort_by in DETAIL_COLUMNS:
+        direction = "DESC" if descending else "ASC"
+        order = f"{DETAIL_COLUMNS[sort_by]} {direction}, s.id {direction}"
+    query = (
+        f"SELECT {select} FROM suspicions s JOIN reports r ON s.report_id = r.id"
+        f"{where} ORDER BY {order}"
+    )
+    return query, params
+
+
+def write_export(chunks, fmt: str, columns: list[str]) -> bytes:
+    out = io.BytesIO()
+    if fmt == "csv":
+        text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+        text.write(",".join(columns) + "\n")
+        for chunk in chunks:
+            chunk.to_csv(text, index=False, header=False)
+        text.flush()
+        text.detach()
+    elif fmt == "xlsx":
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("suspicions")
+        sheet.append(columns)
+        for chunk in chunks:
+            for row in chunk.itertuples(index=False):
+                sheet.append(list(row))
+        workbook.save(out)
+    elif fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(c, pa.string()) for c in columns])
+        with pq.ParquetWriter(out, schema) as writer:
+            for chunk in chunks:
+                writer.write_table(
+                    pa.Table.from_pandas(
+                        chunk.astype("string"), schema=schema, preserve_index=False
+                    )
+                )
+    else:
+        raise ValueError(f"Format d'export inconnu: {fmt}")
+    return out.getvalue()
+
+
+def latest_report_date(
+    db_path: str | None = None,
+    csv_source: str | None = None,
+    extracted_dir: str | None = None,
+) -> tuple[int | None, int | None]:
+    latest = _latest_db_date(db_path or DB_PATH)
+    if latest is None:
+        candidates = [
+            _latest_extracted_date(extracted_dir or EXTRACTED_DIR),
+            _latest_csv_source_date(csv_source or CSV_SOURCE),
+        ]
+        candidates = [c for c in candidates if c]
+        latest = max(candidates) if candidates else None
+    if latest is None:
+        return None, None
+    return latest
+
+
+WRITE_WAIT_LOG = 120
+REBUILD_TIMEOUT = 900
+
+_write_queue: queue.Queue = queue.Queue()
+_writer_guard = threading.Lock()
+_writer: threading.Thread | None = None
+
+
+def _write_batch(db_path: str, items: list[dict]) -> dict[str, int]:
+    if not os.path.exists(db_path):
+        for item in items:
+            if item["write_csv"]:
+                write_report_csv(
+                    item["report_date"],
+                    item["extracted_data"].get("suspicions", []),
+                    item["extracted_dir"],
+                    ingested=True,
+                )
+        logger.info(
+            "%d rapport(s) écrit(s) en CSV, base absente (reconstruite au démarrage)",
+            len(items),
+        )
+        return {item["report_date"]: 0 for item in items}
+
+    conn = sqlite3.connect(db_path)
+    try:
+        _migrate_schema(conn)
+        counts = {}
+        for item in items:
+            counts[item["report_date"]] = _store_report(
+                conn,
+                item["report_date"],
+                item["file_path"],
+                item["extracted_data"],
+                item["confidence_score"],
+                item["extraction_method"],
+            )
+        for item in items:
+            if item["write_csv"]:
+                write_report_csv(
+                    item["report_date"],
+                    item["extracted_data"].get("suspicions", []),
+                    item["extracted_dir"],
+                    ingested=True,
+                )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return counts
+
+
+def _write_reports(pending: list[tuple[Future, dict]]) -> None:
+    batches: dict[tuple, dict[str, list]] = {}
+    for future, item in pending:
+        target = (item["db_path"], item["generation_file"])
+        batch = batches.setdefault(target, {})
+        batch.setdefault(item["report_date"], []).append((future, item))
+
+    for (db_path, generation_file), by_date in batches.items():
+        latest = [entries[-1][1] for entries in by_date.values()]
+        try:
+            counts = _write_batch(db_path, latest)
+        except Exception as e:
+            if len(latest) == 1:
+                _fail_futures(by_date[latest[0]["report_date"]], e)
+                continue
+            logger.warning("Lot d'écriture en échec (%s), rapport par rapport", e)
+            counts = {}
+            for item in latest:
+                try:
+                    counts.update(_write_batch(db_path, [item]))
+                except Exception as item_error:
+                    _fail_futures(by_date[item["report_date"]], item_error)
+
+        if counts:
+            bump_generation(list(counts), generation_file)
+        for report_date, count in counts.items():
+            logger.info("Rapport %s écrit: %d suspicions", report_date, count)
+            for future, _ in by_date[report_date]:
+                future.set_result(count)
+
+
+def _run_task(future: Future, item: dict) -> None:
+    try:
+        result = item["task"](*item["args"], **item["kwargs"])
+    except Exception as e:
+        future.set_exception(e)
+    else:
+        future.set_result(result)
+
+
+def _process_writes(pending: list[tuple[Future, dict]]) -> None:
+    reports = []
+    for future, item in pending:
+        if "task" not in item:
+            reports.append((future, item))
+            continue
+        if reports:
+            _write_reports(reports)
+            reports = []
+        _run_task(future, item)
+    if reports:
+        _write_reports(reports)
+
+
+def _fail_futures(entries: list[tuple[Future, dict]], error: BaseException) -> None:
+    for future, _ in entries:
+        if not future.done():
+            future.set_exception(error)
+
+
+def _run_writer() -> None:
+    global _writer
+    pending = []
+    try:
+        while True:
+            pending = [_write_queue.get()]
+            while True:
+                try:
+                    pending.append(_write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                _process_writes(pending)
+            except Exception as e:
+                logger.error("Lot d'écriture interrompu: %s", e)
+                _fail_futures(pending, e)
+            for _ in pending:
+                _write_queue.task_done()
+            pending = []
+    except BaseException as e:
+        error = RuntimeError(f"Thread d'écriture arrêté: {e!r}")
+        logger.error("%s", error)
+        with _writer_guard:
+            _writer = None
+            _fail_futures(pending, error)
+            while True:
+                try:
+                    _fail_futures([_write_queue.get_nowait()], error)
+                except queue.Empty:
+                    break
+        raise
+
+
+def _submit(item: dict) -> Future:
+    global _writer
+    future = Future()
+    with _writer_guard:
+        _write_queue.put((future, item))
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run_writer, name="writer", daemon=True)
+            _writer.start()
+    return future
+
+
+def submit_task(func, *args, **kwargs) -> Future:
+    return _submit({"task": func, "args": args, "kwargs": kwargs})
+
+
+def _in_writer() -> bool:
+    return threading.current_thread() is _writer
+
+
+def _wait_write(future: Future):
+    while True:
+        try:
+            return future.result(timeout=WRITE_WAIT_LOG)
+        except FutureTimeout:
+            writer = _writer
+            if writer is None or not writer.is_alive():
+                raise RuntimeError("Thread d'écriture arrêté") from None
+            logger.info("Écriture en attente dans la file (reconstruction en cours ?)")
+
+
+def submit_report(
+    report_date: str,
+    file_path: str,
+    extracted_data: dict,
+    confidence_score: float = 0.0,
+    extraction_method: str = "pdfplumber",
+    db_path: str | None = None,
+    extracted_dir: str | None = None,
+    write_csv: bool = True,
+    generation_file: str | None = None,
+) -> Future:
+    datetime.strptime(report_date, "%Y-%m")
+    return _submit(
+        {
+            "report_date": report_date,
+            "file_path": file_path,
+            "extracted_data": extracted_data,
+            "confidence_score": confidence_score,
+            "extraction_method": extraction_method,
+            "db_path": db_path or DB_PATH,
+            "extracted_dir": extracted_dir or EXTRACTED_DIR,
+            "write_csv": write_csv,
+            "generation_file": generation_file or GENERATION_FILE,
+        }
+    )
+
+
+def ingest_report(
+    report_date: str,
+    file_path: str,
+    extracted_data: dict,
+    confidence_score: float = 0.0,
+    extraction_method: str = "pdfplumber",
+    db_path: str | None = None,
+    extracted_dir: str | None = None,
+    write_csv: bool = True,
+) -> bool:
+    try:
+        future = submit_report(
+            report_date,
+            file_path,
+            extracted_data,
+            confidence_score,
+            extraction_method,
+            db_path=db_path,
+            extracted_dir=extracted_dir,
+            write_csv=write_csv,
+        )
+        _wait_write(future)
+    except Exception as e:
+        logger.error("Erreur ingestion rapport %s: %s", report_date, e)
+        return False
+    return True
+
+
+def build_database(
+    db_path: str | None = None,
+    csv_source: str | None = None,
+    extracted_dir: str | None = None,
+) -> None:
+    if _in_writer():
+        _build_database(db_path, csv_source, extracted_dir)
+        return
+    submit_task(_build_database, db_path, csv_source, extracted_dir).result(
+        timeout=REBUILD_TIMEOUT
+    )
+
+
+def _reset_database(db_path: str, csv_source: str, extracted_dir: str) -> None:
+    if os.path.exists(db_path):
+        shutil.copy2(db_path, db_path + ".backup")
+    _build_database(db_path, csv_source, extracted_dir)
+
+
+KPI_COLUMNS = ["origin", "product_category", "fraud_type"]
+
+
+def compute_kpis(data: pd.DataFrame) -> dict:
+    kpis = {"total": len(data), "distinct": {}, "top": {}, "date_span": None}
+    for column in KPI_COLUMNS:
+        counts = (
+            count_values(data[column])
+            if column in data.columns
+            else pd.Series(dtype=int)
+        )
+        kpis["distinct"][column] = len(counts)
+        kpis["top"][column] = counts.index[0] if len(counts) else "N/A"
+    if "date" in data.columns:
+        dates = data["date"].dropna()
+        dates = dates[dates != ""]
+        if not dates.empty:
+            kpis["date_span"] = (dates.min(), dates.max())
+    return kpis
+
+
 class DataManager:
     def __init__(self, db_path: str | None = None):
         self.db_path = db_path or DB_PATH
         self.csv_source = CSV_SOURCE
         self.extracted_dir = EXTRACTED_DIR
+        self.generation_file = GENERATION_FILE
         self._data: pd.DataFrame | None = None
+        self._generation: tuple[int, int] | None = None
+        self._partitions: dict = {}
+        self._partitions_mtime: int | None = None
+        self._kpis: tuple[str, dict] | None = None
+        self._codes: tuple[str, dict] = ("", {})
+        self._pivots: OrderedDict[tuple, pd.DataFrame] = OrderedDict()
+        self._lock = threading.RLock()
         self._ensure_and_load()
 
     def _ensure_and_load(self) -> None:
-        if os.path.exists(self.db_path):
-            try:
-                os.remove(self.db_path)
-                logger.info("Ancienne base supprimee, reconstruction propre")
-            except Exception:
-                pass
+        with self._lock:
+            self.rebuild()
+            self._load_data()
+
+    def rebuild(self) -> None:
+        build_database(self.db_path, self.csv_source, self.extracted_dir)
+
+    def _refresh_if_stale(self) -> None:
+        with self._lock:
+            generation = _db_generation(self.db_path)
+            if generation is not None and generation != self._generation:
+                logger.info("Nouvelle génération de base détectée, rechargement")
+                self._load_data()
+                return
 
-        csv_df = _load_csv_source(self.csv_source)
-        extracted_df = _load_extracted_csvs(self.extracted_dir)
-        _rebuild_db_from_dataframes(self.db_path, csv_df, extracted_df)
+            try:
+                mtime = os.stat(self.generation_file).st_mtime_ns
+            except FileNotFoundError:
+                return
+            if mtime == self._partitions_mtime:
+                return
+            self._partitions_mtime = mtime
+            partitions = read_generations(self.generation_file)["partitions"]
+            changed = [p for p, g in partitions.items() if self._partitions.get(p) != g]
+            self._partitions = partitions
+            if changed and self._data is not None:
+                self._reload_partitions(changed)
 
-        self._load_data()
+    def _snapshot_partitions(self) -> None:
+        try:
+            self._partitions_mtime = os.stat(self.generation_file).st_mtime_ns
+        except FileNotFoundError:
+            self._partitions_mtime = None
+        self._partitions = read_generations(self.generation_file)["partitions"]
 
     def _load_data(self) -> None:
+        self._generation = _db_generation(self.db_path)
+        self._snapshot_partitions()
+        try:
+            conn = _connect_readonly(self.db_path)
+        except sqlite3.Error as e:
+            logger.error("Base illisible: %s", e)
+            self._data = pd.DataFrame()
+        else:
+            try:
+                self._data = pd.read_sql(LOAD_QUERY, conn)
+            except Exception as e:
+                logger.error("Erreur chargement données: %s", e)
+                self._data = pd.DataFrame()
+            finally:
+                conn.close()
+        self._data.attrs[GENERATION_ATTR] = self.data_generation
+
+    def _reload_partitions(self, report_dates: list[str]) -> None:
+        placeholders = ", ".join("?" for _ in report_dates)
         conn = sqlite3.connect(self.db_path)
         try:
-            query = """
-            SELECT s.*, r.report_date as date, r.report_year as year,
-                   r.report_month as month, r.total_suspicions
-            FROM suspicions s
-            JOIN reports r ON s.report_id = r.id
-            """
-            self._data = pd.read_sql(query, conn)
+            fresh = pd.read_sql(
+                f"{LOAD_QUERY} WHERE r.report_date IN ({placeholders})",
+                conn,
+                params=report_dates,
+            )
         except Exception as e:
-            logger.error("Erreur chargement données: %s", e)
-            self._data = pd.DataFrame()
+            logger.error("Erreur rechargement partitions: %s", e)
+            return
         finally:
             conn.close()
+        kept = (
+            self._data[~self._data["date"].isin(report_dates)]
+            if "date" in self._data.columns
+            else self._data
+        )
+        self._data = pd.concat([kept, fresh], ignore_index=True)
+        self._data.attrs[GENERATION_ATTR] = self.data_generation
+        logger.info(
+            "Partitions rechargées: %s (%d lignes)", ", ".join(report_dates), len(fresh)
+        )
+
+    @property
+    def data_generation(self) -> str:
+        state = json.dumps([self._generation, self._partitions], sort_keys=True)
+        return hashlib.sha1(state.encode()).hexdigest()[:16]
+
+    def generation_of(self, data: pd.DataFrame) -> str:
+        return data.attrs.get(GENERATION_ATTR) or self.data_generation
 
     @property
     def data(self) -> pd.DataFrame:
-        if self._data is None or self._data.empty:
-            self._ensure_and_load()
-        return self._data
+        self._refresh_if_stale()
+        with self._lock:
+            if self._data is None:
+                self._load_data()
+            return self._data
+
+    def get_kpi_snapshot(self) -> dict:
+        with self._lock:
+            data = self.data
+            generation = self.data_generation
+            cached = self._kpis
+            if cached is None or cached[0] != generation:
+                cached = (generation, compute_kpis(data))
+                self._kpis = cached
+            return cached[1]
+
+    def label_codes(self, column: str) -> tuple:
+        with self._lock:
+            data = self.data
+            generation = self.data_generation
+            if self._codes[0] != generation:
+                self._codes = (generation, {})
+                self._pivots.clear()
+            codes = self._codes[1].get(column)
+            if codes is None:
+                codes = label_codes(data[column])
+                self._codes[1][column] = codes
+            return codes
+
+    def pivot(
+        self,
+        filtered: pd.DataFrame,
+        rows: str,
+        cols: str,
+        top_rows: int | None = None,
+        top_cols: int | None = None,
+        fingerprint: str | None = None,
+    ) -> pd.DataFrame:
+        with self._lock:
+            row_codes, row_labels = self.label_codes(rows)
+            col_codes, col_labels = self.label_codes(cols)
+            index = self._data.index
+            generation = self._data.attrs.get(GENERATION_ATTR)
+        if filtered.attrs.get(GENERATION_ATTR) != generation:
+            logger.info(
+                "Données d'une autre génération, pivot %s×%s recalculé", rows, cols
+            )
+            return count_matrix(filtered[rows], filtered[cols], top_rows, top_cols)
+        key = (generation, fingerprint, rows, cols, top_rows, top_cols)
+        with self._lock:
+            if fingerprint is not None and key in self._pivots:
+                self._pivots.move_to_end(key)
+                return self._pivots[key]
+        positions = index.get_indexer(filtered.index)
+        if (positions < 0).any():
+            logger.warning(
+                "Lignes absentes de la génération courante, pivot %s×%s recalculé",
+                rows,
+                cols,
+            )
+            return count_matrix(filtered[rows], filtered[cols], top_rows, top_cols)
+        matrix = pivot_codes(
+            row_codes[positions],
+            row_labels,
+            col_codes[positions],
+            col_labels,
+            top_rows,
+            top_cols,
+        )
+        if fingerprint is not None:
+            with self._lock:
+                self._pivots[key] = matrix
+                while len(self._pivots) > PIVOT_CACHE_SIZE:
+                    self._pivots.popitem(last=False)
+        return matrix
 
     def reload(self) -> None:
-        self._data = None
-        self._ensure_and_load()
+        with self._lock:
+            self._load_data()
+
+    def default_filters(self) -> dict:
+        dates = self.get_available_dates()
+        return {
+            "start_date": dates[0] if dates else None,
+            "end_date": dates[-1] if dates else None,
+            "categories": [],
+            "fraud_types": [],
+            "origins": [],
+        }
 
     def get_available_dates(self) -> list[str]:
         if self._data is None or self._data.empty or "date" not in self._data.columns:
@@ -377,6 +1344,16 @@ class DataManager:
         origins = [o for o in self._data["origin"].dropna().unique() if o]
         return sorted(origins)
 
+    def get_unmapped_origins(self) -> pd.DataFrame:
+        data = self.data
+        if data.empty or "origin_iso3" not in data.columns:
+            return pd.DataFrame(columns=["origin", "count"])
+        origins = data.loc[data["origin_iso3"].fillna("") == "", "origin"]
+        origins = origins[origins.fillna("").astype(str).str.strip() != ""]
+        counts = origins.value_counts().reset_index()
+        counts.columns = ["origin", "count"]
+        return counts
+
     def filter_data(
         self,
         start_date: str | None = None,
@@ -385,6 +1362,7 @@ class DataManager:
         fraud_types: list[str] | None = None,
         origins: list[str] | None = None,
     ) -> pd.DataFrame:
+        self._refresh_if_stale()
         if self._data is None or self._data.empty:
             return pd.DataFrame()
         filtered = self._data.copy()
@@ -408,106 +1386,29 @@ class DataManager:
         confidence_score: float = 0.0,
         extraction_method: str = "pdfplumber",
     ) -> bool:
-        conn = sqlite3.connect(self.db_path)
         try:
-            c = conn.cursor()
-            date_obj = datetime.strptime(report_date, "%Y-%m")
-            year, month = date_obj.year, date_obj.month
-
-            c.execute(
-                "SELECT id FROM reports WHERE report_year = ? AND report_month = ?",
-                (year, month),
-            )
-            existing = c.fetchone()
-
-            suspicions = extracted_data.get("suspicions", [])
-            valid_suspicions = [
-                s
-                for s in suspicions
-                if s.get("product_category", "").strip() and s.get("issue", "").strip()
-            ]
-
-            if existing:
-                report_id = existing[0]
-                c.execute(
-                    "UPDATE reports SET file_path=?, total_suspicions=?, confidence_score=?, extraction_method=?, date_added=? WHERE id=?",
-                    (
-                        file_path,
-                        len(valid_suspicions),
-                        confidence_score,
-                        extraction_method,
-                        datetime.now().isoformat(),
-                        report_id,
-                    ),
-                )
-                c.execute("DELETE FROM suspicions WHERE report_id = ?", (report_id,))
-            else:
-                c.execute(
-                    "INSERT INTO reports (report_date, report_year, report_month, file_path, total_suspicions, confidence_score, extraction_method, date_added) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        report_date,
-                        year,
-                        month,
-                        file_path,
-                        len(valid_suspicions),
-                        confidence_score,
-                        extraction_method,
-                        datetime.now().isoformat(),
-                    ),
-                )
-                report_id = c.lastrowid
-
-            for susp in valid_suspicions:
-                c.execute(
-                    "INSERT INTO suspicions (report_id, source_id, classification, product_category, commodity, issue, origin, notified_by, fraud_type, fraud_category, link_source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        report_id,
-                        susp.get("source_id", ""),
-                        susp.get("classification", ""),
-                        susp.get("product_category", ""),
-                        susp.get("commodity", ""),
-                        susp.get("issue", ""),
-                        susp.get("origin", ""),
-                        susp.get("notified_by", ""),
-                        susp.get("fraud_type", ""),
-                        susp.get("fraud_category", susp.get("fraud_type", "")),
-                        susp.get("link_source", ""),
-                    ),
-                )
-
-            c.execute(
-                "INSERT INTO extraction_logs (report_date, method, extracted_count, announced_count, confidence_score, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
-                (
-                    report_date,
-                    extraction_method,
-                    len(valid_suspicions),
-                    extracted_data.get("total_suspicions", 0),
-                    confidence_score,
-                    datetime.now().isoformat(),
-                ),
-            )
-
-            csv_path = os.path.join(self.extracted_dir, f"report_{report_date}.csv")
-            os.makedirs(self.extracted_dir, exist_ok=True)
-            pd.DataFrame(valid_suspicions).to_csv(
-                csv_path, index=False, encoding="utf-8"
-            )
-
-            conn.commit()
-            logger.info(
-                "Rapport %s ajouté: %d suspicions (confiance: %.1f%%)",
+            future = submit_report(
                 report_date,
-                len(valid_suspicions),
-                confidence_score * 100,
+                file_path,
+                extracted_data,
+                confidence_score,
+                extraction_method,
+                db_path=self.db_path,
+                extracted_dir=self.extracted_dir,
+                generation_file=self.generation_file,
             )
+            count = _wait_write(future)
         except Exception as e:
-            conn.rollback()
             logger.error("Erreur ajout rapport: %s", e)
             return False
-        finally:
-            conn.close()
 
-        self._load_data()
+        logger.info(
+            "Rapport %s ajouté: %d suspicions (confiance: %.1f%%)",
+            report_date,
+            count,
+            confidence_score * 100,
+        )
+        self._refresh_if_stale()
         return True
 
     def check_report_exists(self, year: int, month: int) -> bool:
@@ -544,15 +1445,96 @@ class DataManager:
         finally:
             conn.close()
 
+    def get_slowest_pages(self, limit: int = 20) -> pd.DataFrame:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return pd.read_sql(
+                """
+                SELECT l.report_date, l.method, l.timestamp, p.page, p.engine,
+                       p.text_ms, p.table_ms, p.text_ms + p.table_ms AS total_ms,
+                       p.tables, p.rows_kept, p.rows_dropped, p.fallback
+                FROM extraction_page_logs p
+                JOIN extraction_logs l ON p.log_id = l.id
+                ORDER BY total_ms DESC
+                LIMIT ?
+                """,
+                conn,
+                params=(limit,),
+            )
+        except Exception:
+            return pd.DataFrame()
+        finally:
+            conn.close()
+
+    def count_details(self, filters: dict) -> int:
+        where, params = _details_where(filters)
+        conn = _connect_readonly(self.db_path)
+        try:
+            return conn.execute(
+                "SELECT COUNT(*) FROM suspicions s "
+                f"JOIN reports r ON s.report_id = r.id{where}",
+                params,
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def get_details_page(
+        self,
+        filters: dict,
+        page: int = 1,
+        page_size: int = 50,
+        sort_by: str | None = None,
+        descending: bool = False,
+    ) -> pd.DataFrame:
+        query, params = _details_query(
+            filters, list(DETAIL_COLUMNS), sort_by, descending
+        )
+        conn = _connect_readonly(self.db_path)
+        try:
+            return pd.read_sql(
+                f"{query} LIMIT ? OFFSET ?",
+                conn,
+                params=params + [page_size, (max(page, 1) - 1) * page_size],
+            )
+        finally:
+            conn.close()
+
+    def iter_details(
+        self,
+        filters: dict,
+        columns: list[str] | None = None,
+        sort_by: str | None = None,
+        descending: bool = False,
+        chunk_rows: int = EXPORT_CHUNK_ROWS,
+    ):
+        query, params = _details_query(
+            filters, columns or EXPORT_COLUMNS, sort_by, descending
+        )
+        conn = _connect_readonly(self.db_path)
+        try:
+            yield from pd.read_sql(query, conn, params=params, chunksize=chunk_rows)
+        finally:
+            conn.close()
+
+    def export_details(
+        self,
+        filters: dict,
+        fmt: str,
+        sort_by: str | None = None,
+        descending: bool = False,
+    ) -> bytes:
+        started = datetime.now()
+        chunks = self.iter_details(filters, EXPORT_COLUMNS, sort_by, descending)
+        out = write_export(chunks, fmt, EXPORT_COLUMNS)
+        logger.info(
+            "Export %s généré en %.2fs", fmt, (datetime.now() - started).total_seconds()
+        )
+        return out
+
     def reset_database(self) -> bool:
-        if os.path.exists(self.db_path):
-            try:
-                os.rename(self.db_path, self.db_path + ".backup")
-            except Exception:
-                os.remove(self.db_path)
-        self._data = pd.DataFrame()
-        csv_df = _load_csv_source(self.csv_source)
-        extracted_df = _load_extracted_csvs(self.extracted_dir)
-        _rebuild_db_from_dataframes(self.db_path, csv_df, extracted_df)
-        self._load_data()
-        return True
+        with self._lock:
+            submit_task(
+                _reset_database, self.db_path, self.csv_source, self.extracted_dir
+            ).result(timeout=REBUILD_TIMEOUT)
+            self._load_data()
+            return True
@@ -0,0 +1,82 @@
+import time
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    def __init__(self, key: str, label: str):
+        self.key = key
+        self.label = label
+        self.status = PENDING
+        self.progress = 0.0
+        self.message = "En attente..."
+        self.result = None
+        self.error: str | None = None
+        self.submitted_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def report(self, fraction: float, message: str) -> None:
+        self.progress = min(max(fraction, 0.0), 1.0)
+        self.message = message
+
+
+_jobs: dict[str, Job] = {}
+_queue: queue.Queue = queue.Queue()
+_lock = threading.Lock()
+_worker: threading.Thread | None = None
+
+
+def _run_jobs() -> None:
+    while True:
+        job, func, args, kwargs = _queue.get()
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.message = f"{job.label}..."
+        try:
+            job.result = func(*args, on_progress=job.report, **kwargs)
+            job.status = DONE
+            job.progress = 1.0
+        except Exception as e:
+            logger.error("Tâche %s en échec: %s", job.key, e)
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            _queue.task_done()
+
+
+def submit(key: str, label: str, func, *args, **kwargs) -> Job:
+    global _worker
+    with _lock:
+        job = _jobs.get(key)
+        if job and not job.done:
+            logger.info("Tâche %s déjà en file, pas de doublon", key)
+            return job
+        job = Job(key, label)
+        _jobs[key] = job
+        _queue.put((job, func, args, kwargs))
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_jobs, name="jobs", daemon=True)
+            _worker.start()
+    return job
+
+
+def get_job(key: str) -> Job | None:
+    return _jobs.get(key)
+
+
+def active_jobs() -> list[Job]:
+    return [job for job in list(_jobs.values()) if not job.done]
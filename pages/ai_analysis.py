@@ -1,5 +1,5 @@
 import streamlit as st
-from ai_analyzer import analyze_with_mistral
+from ai_analyzer import CONTEXT_TOKEN_BUDGET, stream_with_mistral
 
 st.title("Analyse IA (Mistral)")
 
@@ -44,6 +44,14 @@ if filtered_data.empty:
 
 st.info(f"Analyse portera sur {len(filtered_data)} suspicions.")
 
+token_budget = st.select_slider(
+    "Taille du contexte envoyé à l'IA (tokens)",
+    options=[1000, 2000, CONTEXT_TOKEN_BUDGET, 6000, 10000],
+    value=CONTEXT_TOKEN_BUDGET,
+    help="Synthèse des données filtrées (tendances, répartitions, croisements, "
+    "échantillon). Un contexte plus grand est plus détaillé mais plus lent.",
+)
+
 suggested_questions = [
     "Quelles sont les tendances récentes des fraudes ?",
     "Quels sont les produits les plus à risque ?",
@@ -65,17 +73,26 @@ if st.button("Exécuter l'analyse", type="primary", disabled=not (api_key and qu
     elif not query:
         st.error("Question requise.")
     else:
-        with st.spinner("Analyse en cours..."):
-            result = analyze_with_mistral(
-                api_key, query, filtered_data, st.session_state.get("ai_conversation")
-            )
+        history = list(st.session_state.get("ai_conversation", []))
+        try:
+            with st.chat_message("assistant"):
+                result = st.write_stream(
+                    stream_with_mistral(
+                        api_key,
+                        query,
+                        filtered_data,
+                        history,
+                        token_budget=token_budget,
+                    )
+                )
+        except (ValueError, RuntimeError) as e:
+            st.error(str(e))
+        else:
             st.session_state.ai_conversation.append({"role": "user", "content": query})
             st.session_state.ai_conversation.append(
                 {"role": "assistant", "content": result}
             )
 
-        st.markdown(result)
-
 if st.session_state.ai_conversation:
     st.divider()
     st.subheader("Historique de la conversation")
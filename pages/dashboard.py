@@ -1,15 +1,9 @@
 import streamlit as st
 import pandas as pd
-from plotly import graph_objects as go
-from visualizations import (
-    create_fraud_by_category_chart,
-    create_fraud_by_type_chart,
-    create_country_choropleth,
-    create_fraud_category_chart,
-    create_timeline_chart,
-    create_timeline_by_fraud_type,
-)
-from utils import format_date_display
+from visualizations import view_figure
+from utils import count_values, format_date_display
+
+PREVIEW_ROWS = 100
 
 st.set_page_config(layout="wide", page_title="Tableau de bord - EUFRAUDSUSPECT")
 
@@ -24,7 +18,6 @@ filtered = dm.filter_data(
     origins=filters.get("origins"),
 )
 
-all_data = dm.data
 
 st.markdown(
     """
@@ -82,6 +75,8 @@ st.markdown(
 st.title("Tableau de bord")
 st.caption("Surveillance des fraudes alimentaires dans l'UE")
 
+kpis = dm.get_kpi_snapshot()
+
 col1, col2, col3, col4 = st.columns(4, gap="medium")
 
 with col1:
@@ -89,7 +84,7 @@ with col1:
         f"""
     <div class="kpi-card">
         <div class="kpi-label">Total suspicions</div>
-        <div class="kpi-value">{len(all_data):,}</div>
+        <div class="kpi-value">{kpis["total"]:,}</div>
         <div class="kpi-sub">base complete</div>
     </div>
     """,
@@ -97,72 +92,44 @@ with col1:
     )
 
 with col2:
-    n_countries = all_data["origin"].nunique() if "origin" in all_data.columns else 0
-    top_country = (
-        all_data["origin"].value_counts().idxmax()
-        if "origin" in all_data.columns and not all_data["origin"].empty
-        else "N/A"
-    )
     st.markdown(
         f"""
     <div class="kpi-card">
         <div class="kpi-label">Pays d'origine</div>
-        <div class="kpi-value">{n_countries}</div>
-        <div class="kpi-sub">#1: {top_country}</div>
+        <div class="kpi-value">{kpis["distinct"]["origin"]}</div>
+        <div class="kpi-sub">#1: {kpis["top"]["origin"]}</div>
     </div>
     """,
         unsafe_allow_html=True,
     )
 
 with col3:
-    n_cats = (
-        all_data["product_category"].nunique()
-        if "product_category" in all_data.columns
-        else 0
-    )
-    top_cat = (
-        all_data["product_category"].value_counts().idxmax()
-        if "product_category" in all_data.columns
-        and not all_data["product_category"].empty
-        else "N/A"
-    )
     st.markdown(
         f"""
     <div class="kpi-card">
         <div class="kpi-label">Categories</div>
-        <div class="kpi-value" style="font-size:1.6rem">{top_cat[:25]}</div>
-        <div class="kpi-sub">{n_cats} uniques</div>
+        <div class="kpi-value" style="font-size:1.6rem">{kpis["top"]["product_category"][:25]}</div>
+        <div class="kpi-sub">{kpis["distinct"]["product_category"]} uniques</div>
     </div>
     """,
         unsafe_allow_html=True,
     )
 
 with col4:
-    n_fraud = (
-        all_data["fraud_type"].nunique() if "fraud_type" in all_data.columns else 0
-    )
-    top_fraud = (
-        all_data["fraud_type"].value_counts().idxmax()
-        if "fraud_type" in all_data.columns and not all_data["fraud_type"].empty
-        else "N/A"
-    )
     st.markdown(
         f"""
     <div class="kpi-card">
         <div class="kpi-label">Type de fraude</div>
-        <div class="kpi-value" style="font-size:1.6rem">{top_fraud[:25]}</div>
-        <div class="kpi-sub">{n_fraud} types</div>
+        <div class="kpi-value" style="font-size:1.6rem">{kpis["top"]["fraud_type"][:25]}</div>
+        <div class="kpi-sub">{kpis["distinct"]["fraud_type"]} types</div>
     </div>
     """,
         unsafe_allow_html=True,
     )
 
-if "date" in all_data.columns:
-    dates_sorted = sorted(all_data["date"].dropna().unique())
-    if len(dates_sorted) > 0:
-        st.caption(
-            f"Periode: {dates_sorted[0]} → {dates_sorted[-1]}  |  Filtres dans la sidebar"
-        )
+if kpis["date_span"]:
+    first_date, last_date = kpis["date_span"]
+    st.caption(f"Periode: {first_date} → {last_date}  |  Filtres dans la sidebar")
 
 st.divider()
 
@@ -172,53 +139,55 @@ if filtered.empty:
     )
     st.stop()
 
-tab_kpi, tab_geo, tab_trends = st.tabs(
-    ["Vue d'ensemble", "Carte mondiale", "Tendances"]
-)
 
-with tab_kpi:
+@st.fragment
+def _overview_tab(filtered: pd.DataFrame) -> None:
     col_a, col_b = st.columns(2)
     with col_a:
         st.markdown(
             '<div class="section-title">Top 15 categories</div>', unsafe_allow_html=True
         )
-        fig_cat = create_fraud_by_category_chart(filtered, max_categories=15)
+        fig_cat = view_figure(dm, "top_categories", filtered, filters)
         st.plotly_chart(fig_cat, use_container_width=True, height=480)
     with col_b:
         st.markdown(
             '<div class="section-title">Repartition par type</div>',
             unsafe_allow_html=True,
         )
-        fig_type = create_fraud_by_type_chart(filtered)
+        fig_type = view_figure(dm, "fraud_types", filtered, filters)
         st.plotly_chart(fig_type, use_container_width=True, height=480)
 
     st.markdown(
         '<div class="section-title">Categorisation des fraudes</div>',
         unsafe_allow_html=True,
     )
-    fig_categ = create_fraud_category_chart(filtered)
+    fig_categ = view_figure(dm, "fraud_categories", filtered, filters)
     st.plotly_chart(fig_categ, use_container_width=True)
 
-with tab_geo:
+
+@st.fragment
+def _map_tab(filtered: pd.DataFrame) -> None:
     st.markdown(
         '<div class="section-title">Carte des origines</div>', unsafe_allow_html=True
     )
-    fig_map = create_country_choropleth(filtered)
+    fig_map = view_figure(dm, "origins_map", filtered, filters)
     st.plotly_chart(fig_map, use_container_width=True, height=600)
 
     if "origin" in filtered.columns:
-        top20 = filtered["origin"].value_counts().head(20).reset_index()
+        top20 = count_values(filtered["origin"]).head(20).reset_index()
         top20.columns = ["Pays", "Suspicions"]
         st.markdown(
             '<div class="section-title">Top 20 pays</div>', unsafe_allow_html=True
         )
         st.bar_chart(top20.set_index("Pays"), color="#d32f2f", height=350)
 
-with tab_trends:
+
+@st.fragment
+def _trends_tab(filtered: pd.DataFrame) -> None:
     st.markdown(
         '<div class="section-title">Evolution mensuelle</div>', unsafe_allow_html=True
     )
-    fig_time = create_timeline_chart(filtered)
+    fig_time = view_figure(dm, "timeline", filtered, filters)
     st.plotly_chart(fig_time, use_container_width=True, height=400)
 
     if "fraud_type" in filtered.columns:
@@ -226,9 +195,26 @@ with tab_trends:
             '<div class="section-title">Types de fraude dans le temps</div>',
             unsafe_allow_html=True,
         )
-        fig_time_type = create_timeline_by_fraud_type(filtered)
+        fig_time_type = view_figure(dm, "timeline_by_type", filtered, filters)
         st.plotly_chart(fig_time_type, use_container_width=True, height=400)
 
+
+tab_kpi, tab_geo, tab_trends = st.tabs(
+    ["Vue d'ensemble", "Carte mondiale", "Tendances"],
+    key="dashboard_tab",
+    on_change="rerun",
+)
+
+if tab_kpi.open:
+    with tab_kpi:
+        _overview_tab(filtered)
+if tab_geo.open:
+    with tab_geo:
+        _map_tab(filtered)
+if tab_trends.open:
+    with tab_trends:
+        _trends_tab(filtered)
+
 st.divider()
 st.subheader("Statistiques completes")
 
@@ -246,18 +232,24 @@ col_stat1, col_stat2 = st.columns(2)
 with col_stat1:
     st.caption(f"{len(filtered)} suspicions filtree")
 with col_stat2:
-    csv = filtered[avail].to_csv(index=False).encode("utf-8")
     st.download_button(
         "Exporter CSV",
-        csv_data,
+        lambda: dm.export_details(filters, "csv"),
         "fraudes.csv",
         "text/csv",
+        on_click="ignore",
         use_container_width=True,
         icon="💾",
     )
 
+if len(filtered) > PREVIEW_ROWS:
+    st.caption(
+        f"Apercu des {PREVIEW_ROWS} premieres suspicions sur {len(filtered)}."
+    )
+    st.page_link("pages/details.py", label="Parcourir toutes les suspicions", icon="📋")
+
 st.dataframe(
-    filtered[avail].head(100),
+    dm.get_details_page(filters, page_size=PREVIEW_ROWS)[avail],
     use_container_width=True,
     hide_index=True,
     height=400,
@@ -1,6 +1,18 @@
 import streamlit as st
 import pandas as pd
-from utils import format_date_display, get_country_code
+from db_adapter import EXPORT_FORMATS
+from utils import OTHERS_LABEL, format_date_display, get_country_code
+from visualizations import data_fingerprint
+
+EXPORT_LABELS = {"csv": "CSV", "xlsx": "Excel (XLSX)", "parquet": "Parquet"}
+PAGE_SIZES = [25, 50, 100, 200]
+SORT_LABELS = {
+    "date": "Periode",
+    "origin": "Pays",
+    "product_category": "Categorie",
+    "commodity": "Produit",
+    "fraud_type": "Type de fraude",
+}
 
 dm = st.session_state.data_manager
 filters = st.session_state.get("filters", {})
@@ -23,6 +35,31 @@ if filtered_data.empty:
 show_cols = ["date", "origin", "product_category", "commodity", "fraud_type", "issue"]
 available = [c for c in show_cols if c in filtered_data.columns]
 
+
+@st.fragment
+def _export_menu(filters: dict) -> None:
+    col_fmt, col_dl = st.columns([1, 1])
+    with col_fmt:
+        fmt = st.selectbox(
+            "Format d'export",
+            list(EXPORT_LABELS),
+            format_func=EXPORT_LABELS.get,
+            label_visibility="collapsed",
+        )
+    sort_by = st.session_state.get("details_sort")
+    descending = st.session_state.get("details_desc", False)
+    with col_dl:
+        st.download_button(
+            "Exporter",
+            lambda: dm.export_details(filters, fmt, sort_by, descending),
+            f"suspicions_detail.{fmt}",
+            EXPORT_FORMATS[fmt],
+            on_click="ignore",
+            use_container_width=True,
+            icon="💾",
+        )
+
+
 col_btn, col_cnt, col_top = st.columns([3, 1, 1])
 with col_cnt:
     st.caption(f"{len(filtered_data)} suspicions")
@@ -34,15 +71,7 @@ with col_top:
         )
 
 with col_btn:
-    csv_data = filtered_data[available].to_csv(index=False).encode("utf-8")
-    st.download_button(
-        "Exporter CSV",
-        csv_data,
-        "suspicions_detail.csv",
-        "text/csv",
-        use_container_width=True,
-        icon="💾",
-    )
+    _export_menu(filters)
 
 if "date" in filtered_data.columns:
     date_stats = filtered_data.groupby("date").size().reset_index(name="cas")
@@ -56,97 +85,141 @@ if "date" in filtered_data.columns:
     )
     st.caption("5 dernieres periodes")
 
-col1, col2 = st.columns([3, 1])
-
-with col1:
-    sel = st.dataframe(
-        filtered_data[available],
-        use_container_width=True,
-        hide_index=True,
-        on_select="rerun",
-        selection_mode=["single-row"],
-        height=500,
-        column_config={
-            "date": st.column_config.TextColumn(
-                "Periode",
-                width="small",
-            ),
-            "origin": st.column_config.TextColumn(
-                "Pays",
-                width="small",
-            ),
-            "product_category": st.column_config.TextColumn(
-                "Categorie",
-                width="medium",
-            ),
-            "commodity": st.column_config.TextColumn(
-                "Produit",
-                width="small",
-            ),
-            "fraud_type": st.column_config.TextColumn(
-                "Type de fraude",
-                width="medium",
-            ),
-            "issue": st.column_config.TextColumn(
-                "Description",
-                width="large",
-            ),
-        },
-    )
 
-with col2:
-    if sel and sel["selection"]["selected_rows"]:
-        row = sel["selection"]["selected_rows"][0]
-        idx = row["_row"]
-        full_row = filtered_data.iloc[idx]
-
-        st.markdown("### Details")
-        if "origin" in full_row.index:
-            code = get_country_code(str(full_row["origin"]))
-            st.metric(
-                "Pays", f"{full_row['origin']} ({code})" if code else full_row["origin"]
-            )
-        if "product_category" in full_row.index:
-            st.metric("Categorie", full_row["product_category"])
-        if "commodity" in full_row.index:
-            st.metric("Produit", full_row["commodity"])
-        if "fraud_type" in full_row.index:
-            st.metric("Type", full_row["fraud_type"])
-        if "issue" in full_row.index:
-            with st.expander("Description"):
-                st.text(full_row["issue"])
-        if "link_source" in filtered_data.columns:
-            link = full_row.get("link_source", "")
-            if link and str(link).startswith("http"):
-                st.link_button("Voir la source", link, use_container_width=True)
+@st.fragment
+def _selection_panel(filters: dict, available: list[str]) -> None:
+    total = dm.count_details(filters)
+    col_sort, col_order, col_size, col_page = st.columns([2, 1, 1, 1])
+    with col_sort:
+        sort_by = st.selectbox(
+            "Trier par",
+            list(SORT_LABELS),
+            format_func=SORT_LABELS.get,
+            key="details_sort",
+        )
+    with col_order:
+        descending = st.toggle("Decroissant", key="details_desc")
+    with col_size:
+        page_size = st.selectbox("Lignes", PAGE_SIZES, index=1, key="details_size")
+    n_pages = max(-(-total // page_size), 1)
+    if st.session_state.get("details_page", 1) > n_pages:
+        st.session_state.details_page = 1
+    with col_page:
+        page = st.number_input(
+            f"Page (sur {n_pages})", 1, n_pages, step=1, key="details_page"
+        )
+
+    page_data = dm.get_details_page(filters, page, page_size, sort_by, descending)
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        sel = st.dataframe(
+            page_data[available],
+            use_container_width=True,
+            hide_index=True,
+            on_select="rerun",
+            selection_mode=["single-row"],
+            height=500,
+            column_config={
+                "date": st.column_config.TextColumn(
+                    "Periode",
+                    width="small",
+                ),
+                "origin": st.column_config.TextColumn(
+                    "Pays",
+                    width="small",
+                ),
+                "product_category": st.column_config.TextColumn(
+                    "Categorie",
+                    width="medium",
+                ),
+                "commodity": st.column_config.TextColumn(
+                    "Produit",
+                    width="small",
+                ),
+                "fraud_type": st.column_config.TextColumn(
+                    "Type de fraude",
+                    width="medium",
+                ),
+                "issue": st.column_config.TextColumn(
+                    "Description",
+                    width="large",
+                ),
+            },
+        )
 
-if "product_category" in filtered_data.columns:
+    with col2:
+        if sel and sel["selection"]["rows"]:
+            idx = sel["selection"]["rows"][0]
+            full_row = page_data.iloc[idx]
+
+            st.markdown("### Details")
+            if "origin" in full_row.index:
+                code = full_row.get("origin_iso3") or get_country_code(
+                    str(full_row["origin"])
+                )
+                st.metric(
+                    "Pays",
+                    f"{full_row['origin']} ({code})" if code else full_row["origin"],
+                )
+            if "product_category" in full_row.index:
+                st.metric("Categorie", full_row["product_category"])
+            if "commodity" in full_row.index:
+                st.metric("Produit", full_row["commodity"])
+            if "fraud_type" in full_row.index:
+                st.metric("Type", full_row["fraud_type"])
+            if "issue" in full_row.index:
+                with st.expander("Description"):
+                    st.text(full_row["issue"])
+            if "link_source" in page_data.columns:
+                link = full_row.get("link_source", "")
+                if link and str(link).startswith("http"):
+                    st.link_button("Voir la source", link, use_container_width=True)
+
+
+@st.fragment
+def _top_categories(filtered_data: pd.DataFrame) -> None:
     with st.expander("Top categories par pays"):
         top_n = st.slider("Nombre de pays", 5, 30, 10)
-        top_countries = filtered_data["origin"].value_counts().head(top_n).index
-        sub = filtered_data[filtered_data["origin"].isin(top_countries)]
-        pivot = pd.crosstab(sub["origin"], sub["product_category"])
-        st.dataframe(pivot, use_container_width=True)
+        pivot = dm.pivot(
+            filtered_data,
+            "origin",
+            "product_category",
+            top_rows=top_n,
+            fingerprint=data_fingerprint(dm.generation_of(filtered_data), filters),
+        ).drop(OTHERS_LABEL, errors="ignore")
+        st.dataframe(pivot.loc[:, pivot.sum() > 0], use_container_width=True)
+
+
+_selection_panel(filters, available)
+
+if "product_category" in filtered_data.columns:
+    _top_categories(filtered_data)
 
 st.divider()
 st.subheader("Statistiques")
 
-tab_cat, tab_pays, tab_fraud = st.tabs(["Categorie", "Pays", "Type de fraude"])
-
-with tab_cat:
-    if "product_category" in filtered_data.columns:
-        cats = filtered_data["product_category"].value_counts().reset_index()
-        cats.columns = ["Categorie", "Nombre"]
-        st.dataframe(cats, use_container_width=True, hide_index=True, height=400)
-
-with tab_pays:
-    if "origin" in filtered_data.columns:
-        origins = filtered_data["origin"].value_counts().reset_index()
-        origins.columns = ["Pays", "Nombre"]
-        st.dataframe(origins, use_container_width=True, hide_index=True, height=400)
-
-with tab_fraud:
-    if "fraud_type" in filtered_data.columns:
-        frauds = filtered_data["fraud_type"].value_counts().reset_index()
-        frauds.columns = ["Type de fraude", "Nombre"]
-        st.dataframe(frauds, use_container_width=True, hide_index=True, height=400)
+tab_cat, tab_pays, tab_fraud = st.tabs(
+    ["Categorie", "Pays", "Type de fraude"], key="details_tab", on_change="rerun"
+)
+
+if tab_cat.open:
+    with tab_cat:
+        if "product_category" in filtered_data.columns:
+            cats = filtered_data["product_category"].value_counts().reset_index()
+            cats.columns = ["Categorie", "Nombre"]
+            st.dataframe(cats, use_container_width=True, hide_index=True, height=400)
+
+if tab_pays.open:
+    with tab_pays:
+        if "origin" in filtered_data.columns:
+            origins = filtered_data["origin"].value_counts().reset_index()
+            origins.columns = ["Pays", "Nombre"]
+            st.dataframe(origins, use_container_width=True, hide_index=True, height=400)
+
+if tab_fraud.open:
+    with tab_fraud:
+        if "fraud_type" in filtered_data.columns:
+            frauds = filtered_data["fraud_type"].value_counts().reset_index()
+            frauds.columns = ["Type de fraude", "Nombre"]
+            st.dataframe(frauds, use_container_width=True, hide_index=True, height=400)
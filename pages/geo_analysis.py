@@ -1,9 +1,7 @@
 import streamlit as st
-from visualizations import (
-    create_country_choropleth,
-    create_origin_notifier_heatmap,
-    create_fraud_by_category_chart,
-)
+import pandas as pd
+from visualizations import cached_figure, data_fingerprint, view_figure
+from utils import OTHERS_LABEL, bucket_top, count_values
 
 dm = st.session_state.data_manager
 filters = st.session_state.get("filters", {})
@@ -22,31 +20,69 @@ if filtered_data.empty:
     st.warning("Aucune donnée avec les filtres actuels.")
     st.stop()
 
-tab1, tab2, tab3 = st.tabs(["Carte mondiale", "Heatmap", "Top pays"])
 
-with tab1:
+@st.fragment
+def _map_tab(filtered_data: pd.DataFrame) -> None:
     st.subheader("Distribution géographique des suspicions")
-    fig_map = create_country_choropleth(filtered_data)
+    fig_map = view_figure(dm, "origins_map", filtered_data, filters)
     st.plotly_chart(fig_map, use_container_width=True)
 
     if "origin" in filtered_data.columns:
-        country_counts = filtered_data["origin"].value_counts().reset_index()
+        country_counts = count_values(filtered_data["origin"]).reset_index()
         country_counts.columns = ["Pays", "Nombre"]
         st.dataframe(country_counts, use_container_width=True, hide_index=True)
 
-with tab2:
+
+@st.fragment
+def _heatmap_tab(filtered_data: pd.DataFrame) -> None:
     st.subheader("Relations pays d'origine / pays notifiant")
-    fig_heat = create_origin_notifier_heatmap(filtered_data)
+    fig_heat = view_figure(dm, "origin_notifier", filtered_data, filters)
     st.plotly_chart(fig_heat, use_container_width=True)
 
-with tab3:
+
+@st.fragment
+def _top_countries_tab(filtered_data: pd.DataFrame) -> None:
     st.subheader("Suspicions par pays et catégorie")
     if (
         "origin" in filtered_data.columns
         and "product_category" in filtered_data.columns
     ):
         top_n = st.slider("Nombre de pays à afficher", 5, 25, 10)
-        top_countries = filtered_data["origin"].value_counts().head(top_n).index
-        filtered_by_country = filtered_data[filtered_data["origin"].isin(top_countries)]
-        fig = create_fraud_by_category_chart(filtered_by_country)
+
+        def top_country_categories() -> pd.Series:
+            pivot = dm.pivot(filtered_data, "origin", "product_category", top_n)
+            counts = pivot.drop(OTHERS_LABEL, errors="ignore").sum().rename("count")
+            return bucket_top(counts[counts > 0], 20)
+
+        fig = cached_figure(
+            "category",
+            top_country_categories,
+            data_fingerprint(
+                dm.generation_of(filtered_data), filters, top_countries=top_n
+            ),
+        )
         st.plotly_chart(fig, use_container_width=True)
+
+
+tab1, tab2, tab3 = st.tabs(
+    ["Carte mondiale", "Heatmap", "Top pays"], key="geo_tab", on_change="rerun"
+)
+
+if tab1.open:
+    with tab1:
+        _map_tab(filtered_data)
+if tab2.open:
+    with tab2:
+        _heatmap_tab(filtered_data)
+if tab3.open:
+    with tab3:
+        _top_countries_tab(filtered_data)
+
+unmapped = dm.get_unmapped_origins()
+if not unmapped.empty:
+    with st.expander(f"Origines non cartographiées ({len(unmapped)})"):
+        st.caption(
+            "Ces origines n'ont pas de code ISO (plusieurs pays, régions, "
+            "orthographe inconnue) et n'apparaissent pas sur la carte."
+        )
+        st.dataframe(unmapped, use_container_width=True, hide_index=True)
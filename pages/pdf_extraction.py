@@ -1,31 +1,87 @@
 import streamlit as st
-import tempfile
 import os
-import pdfplumber
+import hashlib
+import tempfile
+import pandas as pd
 from pdf_processor import (
-    extract_data_from_pdf,
+    iter_suspicions,
     download_latest_report,
-    _detect_fraud_type,
-    _match_headers,
-    EU_TABLE_SETTINGS,
+    get_page_count,
+    extract_page_text,
+    render_page_thumbnail,
+    _confidence_score,
+    _extract_report_date,
+    PDF_REPORTS_DIR,
+    UPLOAD_PREFIX,
 )
 
+PREVIEW_CACHE_ENTRIES = 64
+
+
+@st.cache_data(max_entries=PREVIEW_CACHE_ENTRIES, show_spinner=False)
+def _cached_page_count(digest: str, _pdf_bytes: bytes) -> int:
+    return get_page_count(_pdf_bytes)
+
+
+@st.cache_data(max_entries=PREVIEW_CACHE_ENTRIES, show_spinner=False)
+def _cached_page_text(digest: str, page_num: int, _pdf_bytes: bytes) -> str:
+    return extract_page_text(_pdf_bytes, page_num)
+
+
+@st.cache_data(max_entries=PREVIEW_CACHE_ENTRIES, show_spinner=False)
+def _cached_thumbnail(digest: str, page_num: int, _pdf_bytes: bytes) -> bytes:
+    return render_page_thumbnail(_pdf_bytes, page_num)
+
+
+@st.cache_data(max_entries=PREVIEW_CACHE_ENTRIES, show_spinner=False)
+def _cached_report_date(digest: str, name: str, _pdf_bytes: bytes) -> str | None:
+    return _extract_report_date(name, _pdf_bytes, "")
+
+
+def _pdf_source(name: str, data: bytes, path: str | None = None, **extra) -> dict:
+    return {
+        "name": name,
+        "data": data,
+        "digest": hashlib.sha256(data).hexdigest(),
+        "path": path,
+        **extra,
+    }
+
+
+def _persist_source(source: dict) -> str:
+    if source["path"]:
+        return source["path"]
+    os.makedirs(PDF_REPORTS_DIR, exist_ok=True)
+    path = os.path.join(PDF_REPORTS_DIR, f"{UPLOAD_PREFIX}{source['digest'][:12]}.pdf")
+    if not os.path.exists(path):
+        fd, tmp_path = tempfile.mkstemp(dir=PDF_REPORTS_DIR, suffix=".pdf.tmp")
+        os.chmod(tmp_path, 0o644)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(source["data"])
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    source["path"] = path
+    return path
+
+
 st.title("Test d'extraction PDF")
 
 tab1, tab2, tab3 = st.tabs(
     ["Télécharger un PDF", "Rapport en ligne", "Résultat d'extraction"]
 )
 
-pdf_file = None
-
 with tab1:
     uploaded = st.file_uploader("Choisir un fichier PDF", type="pdf")
     if uploaded:
-        temp_dir = tempfile.mkdtemp()
-        temp_path = os.path.join(temp_dir, "uploaded_report.pdf")
-        with open(temp_path, "wb") as f:
-            f.write(uploaded.getvalue())
-        pdf_file = temp_path
+        current = st.session_state.get("pdf_source")
+        if not current or current.get("file_id") != uploaded.file_id:
+            st.session_state.pdf_source = _pdf_source(
+                uploaded.name, uploaded.getvalue(), file_id=uploaded.file_id
+            )
         st.success("Fichier chargé.")
 
 with tab2:
@@ -33,7 +89,10 @@ with tab2:
         with st.spinner("Téléchargement..."):
             path, date = download_latest_report()
             if path:
-                pdf_file = path
+                with open(path, "rb") as f:
+                    st.session_state.pdf_source = _pdf_source(
+                        os.path.basename(path), f.read(), path=path
+                    )
                 st.success(f"Rapport téléchargé (date: {date})")
             else:
                 st.error(f"Échec: {date}")
@@ -41,20 +100,29 @@ with tab2:
 with tab3:
     pass
 
-if pdf_file:
+source = st.session_state.get("pdf_source")
+
+if source:
+    pdf_bytes = source["data"]
+    digest = source["digest"]
     st.divider()
+    st.caption(f"PDF actif : {source['name']}")
 
     with st.expander("Aperçu du PDF"):
         try:
-            with pdfplumber.open(pdf_file) as pdf:
-                st.write(f"Pages: {len(pdf.pages)}")
-                page_num = st.number_input(
-                    "Page à prévisualiser",
-                    min_value=1,
-                    max_value=len(pdf.pages),
-                    value=1,
-                )
-                text = pdf.pages[page_num - 1].extract_text() or ""
+            page_count = _cached_page_count(digest, pdf_bytes)
+            st.write(f"Pages: {page_count}")
+            page_num = st.number_input(
+                "Page à prévisualiser",
+                min_value=1,
+                max_value=page_count,
+                value=1,
+            )
+            col_thumb, col_text = st.columns([1, 2])
+            with col_thumb:
+                st.image(_cached_thumbnail(digest, page_num - 1, pdf_bytes))
+            with col_text:
+                text = _cached_page_text(digest, page_num - 1, pdf_bytes)
                 st.text(text[:3000])
                 if len(text) > 3000:
                     st.caption(f"... ({len(text)} caractères au total)")
@@ -62,9 +130,46 @@ if pdf_file:
             st.error(f"Erreur: {e}")
 
     if st.button("Lancer l'extraction", type="primary"):
-        with st.spinner("Extraction en cours..."):
-            result = extract_data_from_pdf(pdf_file)
-
+        progress_bar = st.progress(0.0, text="Ouverture du PDF...")
+        rows_placeholder = st.empty()
+        streamed = []
+        page_stats = []
+        total = 0
+        page_count = 0
+        try:
+            for progress in iter_suspicions(pdf_bytes):
+                page_count = progress["page_count"]
+                total = progress["total_suspicions"]
+                page_stats.append(progress["stats"])
+                if progress["suspicions"]:
+                    streamed.extend(progress["suspicions"])
+                    rows_placeholder.dataframe(
+                        pd.DataFrame(streamed),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+                progress_bar.progress(
+                    progress["page"] / page_count,
+                    text=f"Page {progress['page']}/{page_count} — "
+                    f"{len(streamed)} suspicions",
+                )
+        except Exception as e:
+            st.error(f"Erreur d'extraction: {e}")
+        progress_bar.empty()
+        rows_placeholder.empty()
+
+        st.session_state.extraction_result = {
+            "digest": digest,
+            "total_suspicions": total,
+            "suspicions": streamed,
+            "method": "pdfplumber",
+            "page_count": page_count,
+            "page_stats": page_stats,
+            "confidence_score": _confidence_score(len(streamed), total),
+        }
+
+    result = st.session_state.get("extraction_result")
+    if result and result["digest"] == digest:
         suspicions = result.get("suspicions", [])
         total = result.get("total_suspicions", 0)
         confidence = result.get("confidence_score", 0)
@@ -87,9 +192,17 @@ if pdf_file:
                 "L'extraction peut être incomplète (cellules fusionnées, tableaux complexes)."
             )
 
-        if suspicions:
-            import pandas as pd
+        if result.get("page_stats"):
+            with st.expander("Temps par page"):
+                stats_df = pd.DataFrame(result["page_stats"])
+                stats_df["total_ms"] = stats_df["text_ms"] + stats_df["table_ms"]
+                st.dataframe(
+                    stats_df.sort_values("total_ms", ascending=False),
+                    use_container_width=True,
+                    hide_index=True,
+                )
 
+        if suspicions:
             df = pd.DataFrame(suspicions)
             st.subheader("Données extraites")
             st.dataframe(df, use_container_width=True, hide_index=True)
@@ -99,20 +212,30 @@ if pdf_file:
                 "Télécharger CSV extrait", csv, "extraction_result.csv", "text/csv"
             )
 
-            if st.button("Ajouter à la base de données"):
+            detected_date = _cached_report_date(digest, source["name"], pdf_bytes)
+            if not detected_date:
+                st.warning("Date du rapport non détectée, saisissez-la manuellement.")
+            report_date = st.text_input(
+                "Date du rapport (YYYY-MM)", value=detected_date or ""
+            )
+            if st.button("Ajouter à la base de données") and report_date:
                 dm = st.session_state.data_manager
-                report_date = st.text_input(
-                    "Date du rapport (YYYY-MM)", value="2025-01"
+                success = dm.add_report_data(
+                    report_date,
+                    _persist_source(source),
+                    result,
+                    confidence_score=confidence,
+                    extraction_method=method,
                 )
-                if report_date:
-                    success = dm.add_report_data(
-                        report_date,
-                        pdf_file,
-                        result,
-                        confidence_score=confidence,
-                        extraction_method=method,
-                    )
-                    if success:
-                        st.success("Données ajoutées à la base !")
-                    else:
-                        st.error("Erreur lors de l'ajout.")
+                if success:
+                    st.success("Données ajoutées à la base !")
+                else:
+                    st.error("Erreur lors de l'ajout.")
+
+if "data_manager" in st.session_state:
+    with st.expander("Pages les plus lentes (historique)"):
+        slowest = st.session_state.data_manager.get_slowest_pages(limit=20)
+        if slowest.empty:
+            st.info("Aucune mesure par page enregistrée.")
+        else:
+            st.dataframe(slowest, use_container_width=True, hide_index=True)
@@ -1,5 +1,5 @@
 import streamlit as st
-from visualizations import create_timeline_chart, create_timeline_by_fraud_type
+from visualizations import view_figure
 
 dm = st.session_state.data_manager
 filters = st.session_state.get("filters", {})
@@ -25,15 +25,19 @@ if (
     st.info("Pas assez de périodes pour afficher des tendances.")
     st.stop()
 
-tab1, tab2 = st.tabs(["Évolution globale", "Par type de fraude"])
+tab1, tab2 = st.tabs(
+    ["Évolution globale", "Par type de fraude"], key="trends_tab", on_change="rerun"
+)
 
-with tab1:
-    fig = create_timeline_chart(filtered_data)
-    st.plotly_chart(fig, use_container_width=True)
+if tab1.open:
+    with tab1:
+        fig = view_figure(dm, "timeline", filtered_data, filters)
+        st.plotly_chart(fig, use_container_width=True)
 
-with tab2:
-    fig = create_timeline_by_fraud_type(filtered_data)
-    st.plotly_chart(fig, use_container_width=True)
+if tab2.open:
+    with tab2:
+        fig = view_figure(dm, "timeline_by_type", filtered_data, filters)
+        st.plotly_chart(fig, use_container_width=True)
 
 with st.expander("Statistiques par période"):
     if "date" in filtered_data.columns:
@@ -1,18 +1,22 @@
+import io
 import os
 import re
+import json
+import hashlib
+import time
 import logging
 import tempfile
 from datetime import datetime
 
 import pandas as pd
-import pdfplumber
-import PyPDF2
-import requests
-from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://food.ec.europa.eu/food-safety/acn/ffn-monthly_en"
+PDF_REPORTS_DIR = os.path.join(os.path.dirname(__file__), "data", "pdf_reports")
+INDEX_CACHE_FILE = "index_cache.json"
+UPLOAD_PREFIX = "upload_"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 EU_TABLE_SETTINGS = {
     "vertical_strategy": "lines",
@@ -30,6 +34,15 @@ FRAUD_SECTION_PATTERNS = [
     (r"3\.?\s*OTHER\s+NON-COMPLIANCES", "Other non-compliances"),
 ]
 
+ANNOUNCEMENT_PAGES = 3
+FIRST_TABLE_PAGE = 2
+EXTRACTION_TOLERANCE = 0.2
+
+TEXT_LINE_TOLERANCE = 2.0
+TEXT_HEADER_SPAN = 14.0
+TEXT_COLUMN_TOLERANCE = 4.0
+TEXT_ROW_GAP_RATIO = 1.6
+
 EXPECTED_HEADERS = [
     "CLASSIFICATION",
     "PRODUCT CATEGORY",
@@ -69,24 +82,38 @@ def _match_headers(header_row: list) -> dict[str, int]:
     return indices
 
 
+def _match_total_suspicions(text: str) -> int:
+    match = re.search(
+        r"THIS MONTH (\d+) SUSPICIONS WERE RETRIEVED", text, re.IGNORECASE
+    )
+    return int(match.group(1)) if match else 0
+
+
 def _extract_total_suspicions(pdf_path: str) -> int:
+    import pdfplumber
+
     try:
         with pdfplumber.open(pdf_path) as pdf:
-            for page_num in range(min(3, len(pdf.pages))):
-                text = pdf.pages[page_num].extract_text() or ""
-                match = re.search(
-                    r"THIS MONTH (\d+) SUSPICIONS WERE RETRIEVED", text, re.IGNORECASE
+            for page_num in range(min(ANNOUNCEMENT_PAGES, len(pdf.pages))):
+                total = _match_total_suspicions(
+                    pdf.pages[page_num].extract_text() or ""
                 )
-                if match:
-                    return int(match.group(1))
+                if total:
+                    return total
     except Exception as e:
         logger.warning("Extraction total suspicions echouee: %s", e)
     return 0
 
 
-def _extract_date_from_pdf(pdf_path: str) -> str | None:
+def _extract_date_from_pdf(pdf_path: str | bytes) -> str | None:
+    import PyPDF2
+
     try:
-        with open(pdf_path, "rb") as f:
+        if isinstance(pdf_path, bytes):
+            stream = io.BytesIO(pdf_path)
+        else:
+            stream = open(pdf_path, "rb")
+        with stream as f:
             reader = PyPDF2.PdfReader(f)
             if not reader.pages:
                 return None
@@ -114,26 +141,34 @@ def _extract_date_from_pdf(pdf_path: str) -> str | None:
     return None
 
 
-def _extract_report_date(filename: str, pdf_path: str, full_url: str) -> str:
-    if "?filename=" in full_url:
-        fname = full_url.split("?filename=")[-1]
-    else:
-        fname = filename
+def _report_date_from_name(fname: str) -> str | None:
     match = re.search(r"report[_-](\d{4})(\d{2})\.pdf", fname, re.IGNORECASE)
     if match:
         return f"{match.group(1)}-{match.group(2)}"
     match = re.search(r"(\d{4})[_-](\d{2})\.pdf", fname, re.IGNORECASE)
     if match:
         return f"{match.group(1)}-{match.group(2)}"
+    return None
+
+
+def _extract_report_date(
+    filename: str, pdf_path: str | bytes, full_url: str
+) -> str | None:
+    if "?filename=" in full_url:
+        fname = full_url.split("?filename=")[-1]
+    else:
+        fname = filename
+    date = _report_date_from_name(fname)
+    if date:
+        return date
     date = _extract_date_from_pdf(pdf_path)
     if date:
         return date
     match = re.search(r"(\d{4})(\d{2})\.pdf", fname)
     if match:
         return f"{match.group(1)}-{match.group(2)}"
-    now = datetime.now()
-    logger.warning("Date non extractible, utilisation date actuelle")
-    return f"{now.year}-{now.month:02d}"
+    logger.warning("Date non extractible pour %s", fname)
+    return None
 
 
 def _clean_value(text: str) -> str:
@@ -144,195 +179,682 @@ def _clean_value(text: str) -> str:
     return text.strip()
 
 
-def extract_data_from_pdf(pdf_path: str) -> dict:
-    extracted_data = {"total_suspicions": 0, "suspicions": [], "method": "pdfplumber"}
-    total_announced = _extract_total_suspicions(pdf_path)
-    extracted_data["total_suspicions"] = total_announced
-
-    current_fraud_type = None
-    current_classification = None
-    last_values = {}
+def _new_extraction_state() -> dict:
+    return {
+        "fraud_type": None,
+        "classification": None,
+        "last_values": {},
+        "rows_dropped": 0,
+    }
+
+
+def _update_section(text: str, state: dict) -> None:
+    detected, changed = _detect_fraud_type(text, state["fraud_type"])
+    if changed:
+        state["fraud_type"] = detected
+        state["last_values"] = {}
+        state["classification"] = None
+
+
+def _page_stats(
+    page_num: int,
+    engine: str,
+    text_seconds: float,
+    table_seconds: float,
+    tables: int,
+    rows_kept: int,
+    rows_dropped: int,
+    fallback: str = "",
+) -> dict:
+    return {
+        "page": page_num + 1,
+        "engine": engine,
+        "text_ms": round(text_seconds * 1000, 2),
+        "table_ms": round(table_seconds * 1000, 2),
+        "tables": tables,
+        "rows_kept": rows_kept,
+        "rows_dropped": rows_dropped,
+        "fallback": fallback,
+    }
+
+
+def _parse_tables(tables: list, state: dict) -> list[dict]:
     suspicions = []
+    last_values = state["last_values"]
 
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            start_page = 2
-            for page_num in range(start_page, len(pdf.pages)):
-                page = pdf.pages[page_num]
+    for table in tables:
+        if not table or len(table) <= 1:
+            continue
+
+        header_row = table[0]
+        header_indices = _match_headers(header_row)
+
+        if len(header_indices) < 3:
+            state["rows_dropped"] += len(table) - 1
+            continue
+
+        for row in table[1:]:
+            if not row or all(
+                not cell or (isinstance(cell, str) and cell.strip() == "")
+                for cell in row
+            ):
+                state["rows_dropped"] += 1
+                continue
+
+            for i, cell in enumerate(row):
+                if cell and isinstance(cell, str) and cell.strip():
+                    last_values[i] = cell.strip()
+
+            if "CLASSIFICATION" in header_indices:
+                idx = header_indices["CLASSIFICATION"]
+                if (
+                    idx < len(row)
+                    and row[idx]
+                    and isinstance(row[idx], str)
+                    and row[idx].strip()
+                ):
+                    state["classification"] = row[idx].strip()
+                else:
+                    val = last_values.get(idx, "")
+                    if val:
+                        state["classification"] = val
+
+            suspicion = {
+                "fraud_type": state["fraud_type"] or "",
+                "classification": state["classification"] or "",
+                "product_category": "",
+                "commodity": "",
+                "issue": "",
+                "origin": "",
+                "notified_by": "",
+            }
+
+            for field, header in [
+                ("product_category", "PRODUCT CATEGORY"),
+                ("commodity", "COMMODITY"),
+                ("issue", "ISSUE"),
+                ("origin", "ORIGIN"),
+                ("notified_by", "NOTIFIED BY"),
+            ]:
+                if header in header_indices:
+                    idx = header_indices[header]
+                    if (
+                        idx < len(row)
+                        and row[idx]
+                        and isinstance(row[idx], str)
+                        and row[idx].strip()
+                    ):
+                        suspicion[field] = row[idx].strip()
+                    elif field in ["product_category", "classification"]:
+                        suspicion[field] = last_values.get(idx, "")
+
+            essential = ["product_category", "commodity", "issue"]
+            if all(suspicion[f] == "" for f in essential):
+                state["rows_dropped"] += 1
+                continue
+
+            for key in suspicion:
+                suspicion[key] = _clean_value(suspicion[key])
+
+            suspicions.append(suspicion)
+
+    return suspicions
+
+
+def _parse_page(page, text: str, state: dict) -> tuple[list[dict], int, str]:
+    _update_section(text, state)
+
+    fallback = ""
+    tables = page.extract_tables(table_settings=EU_TABLE_SETTINGS)
+    if not tables:
+        tables = page.extract_tables()
+        fallback = "default_table_settings"
+    return _parse_tables(tables, state), len(tables), fallback
+
+
+def _open_pdf(pdf_source: str | bytes):
+    import pdfplumber
+
+    if isinstance(pdf_source, bytes):
+        return pdfplumber.open(io.BytesIO(pdf_source))
+    return pdfplumber.open(pdf_source)
+
+
+def get_page_count(pdf_source: str | bytes) -> int:
+    with _open_pdf(pdf_source) as pdf:
+        return len(pdf.pages)
+
+
+def extract_page_text(pdf_source: str | bytes, page_num: int) -> str:
+    with _open_pdf(pdf_source) as pdf:
+        return pdf.pages[page_num].extract_text() or ""
+
+
+def render_page_thumbnail(
+    pdf_source: str | bytes, page_num: int, resolution: int = 60
+) -> bytes:
+    with _open_pdf(pdf_source) as pdf:
+        image = pdf.pages[page_num].to_image(resolution=resolution).original
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _page_text_runs(page) -> list[tuple[float, float, str, float]]:
+    runs = []
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        if text and text.strip():
+            x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+            y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+            size = abs(font_size * tm[3] * cm[3]) or font_size
+            runs.append((x, y, text.strip(), size))
+
+    page.extract_text(visitor_text=visitor)
+    return runs
+
+
+def _group_lines(
+    runs: list[tuple[float, float, str, float]],
+) -> list[tuple[float, list]]:
+    lines = []
+    for x, y, text, _ in sorted(runs, key=lambda r: (-r[1], r[0])):
+        if lines and abs(lines[-1][0] - y) <= TEXT_LINE_TOLERANCE:
+            lines[-1][1].append((x, text))
+        else:
+            lines.append((y, [(x, text)]))
+    return [(y, sorted(line_runs)) for y, line_runs in lines]
+
+
+def _find_header(lines: list) -> tuple[int, list[tuple[str, float]]] | None:
+    for i, (y, line_runs) in enumerate(lines):
+        candidates = list(line_runs)
+        last = i
+        if i + 1 < len(lines) and y - lines[i + 1][0] <= TEXT_HEADER_SPAN:
+            candidates.extend(lines[i + 1][1])
+            last = i + 1
+        header_indices = _match_headers([text for _, text in candidates])
+        if len(header_indices) < 3:
+            continue
+        columns = {}
+        for header, idx in header_indices.items():
+            columns[header] = min(
+                x
+                for x, text in candidates
+                if _match_headers([text]).get(header) is not None
+            )
+        return last, sorted(columns.items(), key=lambda c: c[1])
+    return None
+
+
+def _rebuild_table(
+    lines: list, columns: list[tuple[str, float]], font_size: float, state: dict
+) -> list[list]:
+    starts = [x - TEXT_COLUMN_TOLERANCE for _, x in columns]
+
+    rows = []
+    previous_y = None
+    for y, line_runs in lines:
+        if previous_y is None or previous_y - y > font_size * TEXT_ROW_GAP_RATIO:
+            rows.append([[] for _ in columns])
+        for x, text in line_runs:
+            col = max((i for i, start in enumerate(starts) if x >= start), default=0)
+            rows[-1][col].append(text)
+        previous_y = y
+
+    headers = [header for header, _ in columns]
+    table = [headers]
+    for row in rows:
+        cells = [" ".join(parts) or None for parts in row]
+        if not any(
+            cells[headers.index(h)] for h in ("COMMODITY", "ISSUE") if h in headers
+        ):
+            state["rows_dropped"] += 1
+            continue
+        table.append(cells)
+    return table
+
+
+def _iter_text_layer(pdf_path: str | bytes):
+    import PyPDF2
+
+    state = _new_extraction_state()
+    total_announced = 0
+    started = time.perf_counter()
+
+    source = io.BytesIO(pdf_path) if isinstance(pdf_path, bytes) else pdf_path
+    reader = PyPDF2.PdfReader(source)
+    page_count = len(reader.pages)
+    for page_num in range(page_count):
+        page_started = time.perf_counter()
+        runs = _page_text_runs(reader.pages[page_num])
+        lines = _group_lines(runs)
+        text = "\n".join(" ".join(t for _, t in line_runs) for _, line_runs in lines)
+        if page_num < ANNOUNCEMENT_PAGES and not total_announced:
+            total_announced = _match_total_suspicions(text)
+        text_done = time.perf_counter()
+
+        suspicions = []
+        tables = 0
+        dropped_before = state["rows_dropped"]
+        if page_num >= FIRST_TABLE_PAGE:
+            _update_section(text, state)
+            header = _find_header(lines)
+            if header:
+                header_line, columns = header
+                sizes = sorted(size for _, _, _, size in runs)
+                table = _rebuild_table(
+                    lines[header_line + 1 :], columns, sizes[len(sizes) // 2], state
+                )
+                suspicions = _parse_tables([table], state)
+                tables = 1
+
+        yield {
+            "page": page_num + 1,
+            "page_count": page_count,
+            "total_suspicions": total_announced,
+            "suspicions": suspicions,
+            "elapsed": time.perf_counter() - started,
+            "stats": _page_stats(
+                page_num,
+                "pypdf2",
+                text_done - page_started,
+                time.perf_counter() - text_done,
+                tables,
+                len(suspicions),
+                state["rows_dropped"] - dropped_before,
+            ),
+        }
+
+
+def iter_suspicions(pdf_path: str | bytes, engine: str = "pdfplumber"):
+    if engine == "pypdf2":
+        yield from _iter_text_layer(pdf_path)
+        return
+
+    state = _new_extraction_state()
+    total_announced = 0
+    started = time.perf_counter()
+
+    with _open_pdf(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+        for page_num in range(page_count):
+            page = pdf.pages[page_num]
+            page_started = time.perf_counter()
+            try:
                 text = page.extract_text() or ""
+                if page_num < ANNOUNCEMENT_PAGES and not total_announced:
+                    total_announced = _match_total_suspicions(text)
+                text_done = time.perf_counter()
+
+                suspicions, tables, fallback = [], 0, ""
+                dropped_before = state["rows_dropped"]
+                if page_num >= FIRST_TABLE_PAGE:
+                    suspicions, tables, fallback = _parse_page(page, text, state)
+            finally:
+                page.close()
+
+            yield {
+                "page": page_num + 1,
+                "page_count": page_count,
+                "total_suspicions": total_announced,
+                "suspicions": suspicions,
+                "elapsed": time.perf_counter() - started,
+                "stats": _page_stats(
+                    page_num,
+                    "pdfplumber",
+                    text_done - page_started,
+                    time.perf_counter() - text_done,
+                    tables,
+                    len(suspicions),
+                    state["rows_dropped"] - dropped_before,
+                    fallback,
+                ),
+            }
+
+
+def _within_tolerance(extracted_count: int, total_announced: int) -> bool:
+    return (
+        total_announced > 0
+        and abs(extracted_count - total_announced)
+        <= total_announced * EXTRACTION_TOLERANCE
+    )
+
 
-                detected, changed = _detect_fraud_type(text, current_fraud_type)
-                if changed:
-                    current_fraud_type = detected
-                    last_values = {}
-                    current_classification = None
-
-                tables = page.extract_tables(table_settings=EU_TABLE_SETTINGS)
-                if not tables:
-                    tables = page.extract_tables()
-
-                for table in tables:
-                    if not table or len(table) <= 1:
-                        continue
-
-                    header_row = table[0]
-                    header_indices = _match_headers(header_row)
-
-                    if len(header_indices) < 3:
-                        continue
-
-                    for row in table[1:]:
-                        if not row or all(
-                            not cell or (isinstance(cell, str) and cell.strip() == "")
-                            for cell in row
-                        ):
-                            continue
-
-                        for i, cell in enumerate(row):
-                            if cell and isinstance(cell, str) and cell.strip():
-                                last_values[i] = cell.strip()
-
-                        if "CLASSIFICATION" in header_indices:
-                            idx = header_indices["CLASSIFICATION"]
-                            if (
-                                idx < len(row)
-                                and row[idx]
-                                and isinstance(row[idx], str)
-                                and row[idx].strip()
-                            ):
-                                current_classification = row[idx].strip()
-                            else:
-                                val = last_values.get(idx, "")
-                                if val:
-                                    current_classification = val
-
-                        suspicion = {
-                            "fraud_type": current_fraud_type or "",
-                            "classification": current_classification or "",
-                            "product_category": "",
-                            "commodity": "",
-                            "issue": "",
-                            "origin": "",
-                            "notified_by": "",
-                        }
-
-                        for field, header in [
-                            ("product_category", "PRODUCT CATEGORY"),
-                            ("commodity", "COMMODITY"),
-                            ("issue", "ISSUE"),
-                            ("origin", "ORIGIN"),
-                            ("notified_by", "NOTIFIED BY"),
-                        ]:
-                            if header in header_indices:
-                                idx = header_indices[header]
-                                if (
-                                    idx < len(row)
-                                    and row[idx]
-                                    and isinstance(row[idx], str)
-                                    and row[idx].strip()
-                                ):
-                                    suspicion[field] = row[idx].strip()
-                                elif field in ["product_category", "classification"]:
-                                    suspicion[field] = last_values.get(idx, "")
-
-                        essential = ["product_category", "commodity", "issue"]
-                        if all(suspicion[f] == "" for f in essential):
-                            continue
-
-                        for key in suspicion:
-                            suspicion[key] = _clean_value(suspicion[key])
-
-                        suspicions.append(suspicion)
+def _confidence_score(extracted_count: int, total_announced: int) -> float:
+    if total_announced > 0 and extracted_count > 0:
+        if not _within_tolerance(extracted_count, total_announced):
+            logger.warning(
+                "Ecart extraction: %d extraites vs %d annoncees",
+                extracted_count,
+                total_announced,
+            )
+        return min(extracted_count / total_announced, 1.5)
+    return 0.5
+
+
+def _collect_suspicions(pdf_path: str | bytes, engine: str, on_progress=None) -> dict:
+    extracted_data = {
+        "total_suspicions": 0,
+        "suspicions": [],
+        "method": engine,
+        "page_count": 0,
+        "page_stats": [],
+    }
+    suspicions = []
 
+    try:
+        for progress in iter_suspicions(pdf_path, engine=engine):
+            suspicions.extend(progress["suspicions"])
+            extracted_data["page_stats"].append(progress["stats"])
+            extracted_data["total_suspicions"] = progress["total_suspicions"]
+            extracted_data["page_count"] = progress["page_count"]
+            if on_progress:
+                on_progress(
+                    progress["page"] / progress["page_count"],
+                    f"Extraction {engine}: page {progress['page']}/{progress['page_count']}",
+                )
+    except MemoryError:
+        raise
     except Exception as e:
-        logger.error("Erreur extraction PDF: %s", e)
+        logger.error("Erreur extraction PDF (%s): %s", engine, e)
 
     extracted_data["suspicions"] = suspicions
-    if total_announced > 0 and len(suspicions) > 0:
-        extracted_data["confidence_score"] = min(len(suspicions) / total_announced, 1.5)
-        if abs(len(suspicions) - total_announced) > total_announced * 0.2:
-            logger.warning(
-                "Ecart extraction: %d extraites vs %d annoncees",
-                len(suspicions),
+    return extracted_data
+
+
+def extract_data_from_pdf(
+    pdf_path: str | bytes, engine: str = "auto", on_progress=None
+) -> dict:
+    if engine in ("auto", "pypdf2"):
+        extracted_data = _collect_suspicions(pdf_path, "pypdf2", on_progress)
+        extracted_count = len(extracted_data["suspicions"])
+        total_announced = extracted_data["total_suspicions"]
+        if engine == "auto" and not _within_tolerance(extracted_count, total_announced):
+            logger.info(
+                "Chemin texte hors tolerance (%d vs %d annoncees), repli pdfplumber",
+                extracted_count,
                 total_announced,
             )
+            rejected_stats = extracted_data["page_stats"]
+            extracted_data = _collect_suspicions(pdf_path, "pdfplumber", on_progress)
+            for stats in extracted_data["page_stats"]:
+                stats["fallback"] = stats["fallback"] or "pypdf2_rejected"
+            extracted_data["page_stats"] = rejected_stats + extracted_data["page_stats"]
     else:
-        extracted_data["confidence_score"] = 0.5
+        extracted_data = _collect_suspicions(pdf_path, "pdfplumber", on_progress)
 
+    extracted_data["confidence_score"] = _confidence_score(
+        len(extracted_data["suspicions"]), extracted_data["total_suspicions"]
+    )
     return extracted_data
 
 
-def download_latest_report(save_dir: str | None = None) -> tuple[str | None, str]:
-    if save_dir is None:
-        save_dir = os.path.join(os.path.dirname(__file__), "data", "pdf_reports")
-    os.makedirs(save_dir, exist_ok=True)
+def _load_index_cache(save_dir: str) -> dict:
+    cache_path = os.path.join(save_dir, INDEX_CACHE_FILE)
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Cache index illisible, ignore: %s", e)
+        return {}
+
 
+def _save_index_cache(save_dir: str, cache: dict) -> None:
+    cache_path = os.path.join(save_dir, INDEX_CACHE_FILE)
+    fd, tmp_path = tempfile.mkstemp(dir=save_dir, suffix=".tmp")
+    os.chmod(tmp_path, 0o644)
     try:
-        response = requests.get(BASE_URL, timeout=30)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning("Ecriture cache index echouee: %s", e)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _parse_pdf_links(html: bytes) -> list[str]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    pdf_links = []
+    pattern = re.compile(r"report.*\d{4}.*\.pdf", re.IGNORECASE)
+    for link in soup.find_all("a", href=True):
+        href = link["href"]
+        if pattern.search(href) and href.endswith(".pdf"):
+            pdf_links.append(href)
+    return pdf_links
+
+
+def _fetch_report_links(save_dir: str, cache: dict) -> list[str]:
+    import requests
+
+    headers = {}
+    if cache.get("links"):
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    response = requests.get(BASE_URL, headers=headers, timeout=30)
+    if response.status_code == 304:
+        logger.info("Page index inchangee (304), liens en cache")
+        return cache["links"]
+    response.raise_for_status()
+
+    cache["links"] = _parse_pdf_links(response.content)
+    cache["etag"] = response.headers.get("ETag")
+    cache["last_modified"] = response.headers.get("Last-Modified")
+    _save_index_cache(save_dir, cache)
+    return cache["links"]
+
+
+def _resolve_report_link(link: str) -> tuple[str, str]:
+    if link.startswith("http"):
+        full_url = link
+    elif link.startswith("/"):
+        domain = re.match(r"(https?://[^/]+)", BASE_URL).group(1)
+        full_url = domain + link
+    else:
+        full_url = BASE_URL.rstrip("/") + "/" + link
+
+    if "?filename=" in full_url:
+        filename = full_url.split("?filename=")[-1]
+    else:
+        filename = os.path.basename(full_url)
+    return full_url, filename
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_verified_download(local_path: str, entry: dict | None) -> bool:
+    if not entry or not os.path.exists(local_path):
+        return False
+    if os.path.getsize(local_path) != entry.get("size"):
+        return False
+    return _file_sha256(local_path) == entry.get("sha256")
+
+
+def _looks_like_complete_pdf(local_path: str) -> bool:
+    size = os.path.getsize(local_path)
+    if size < 16:
+        return False
+    with open(local_path, "rb") as f:
+        header = f.read(5)
+        f.seek(max(size - 1024, 0))
+        tail = f.read()
+    return header == b"%PDF-" and b"%%EOF" in tail
+
+
+def _adopt_local_pdf(
+    full_url: str, local_path: str, save_dir: str, cache: dict
+) -> bool:
+    if not os.path.exists(local_path) or not _looks_like_complete_pdf(local_path):
+        return False
+    cache.setdefault("files", {})[os.path.basename(local_path)] = {
+        "url": full_url,
+        "etag": None,
+        "size": os.path.getsize(local_path),
+        "sha256": _file_sha256(local_path),
+    }
+    _save_index_cache(save_dir, cache)
+    return True
+
+
+def _download_pdf(full_url: str, local_path: str, save_dir: str, cache: dict) -> None:
+    import requests
+
+    filename = os.path.basename(local_path)
+    files = cache.setdefault("files", {})
+    entry = files.get(filename)
+    part_path = local_path + ".part"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {"Accept-Encoding": "identity"}
+    if offset and entry and entry.get("etag"):
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = entry["etag"]
+    else:
+        offset = 0
+
+    digest = hashlib.sha256()
+    with requests.get(full_url, headers=headers, stream=True, timeout=60) as response:
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        pdf_links = []
-        pattern = re.compile(r"report.*\d{4}.*\.pdf", re.IGNORECASE)
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
-            if pattern.search(href) and href.endswith(".pdf"):
-                pdf_links.append(href)
-
-        if not pdf_links:
-            logger.error("Aucun lien PDF trouve")
-            return None, "Aucun lien PDF trouve"
-
-        latest_pdf_link = pdf_links[0]
-        if latest_pdf_link.startswith("http"):
-            full_url = latest_pdf_link
-        elif latest_pdf_link.startswith("/"):
-            domain = re.match(r"(https?://[^/]+)", BASE_URL).group(1)
-            full_url = domain + latest_pdf_link
+        if response.status_code == 206:
+            logger.info("Reprise du telechargement a l'octet %d", offset)
+            with open(part_path, "rb") as f:
+                for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            mode = "ab"
+            content_range = response.headers.get("Content-Range", "")
+            total = content_range.rsplit("/", 1)[-1]
+            expected_size = int(total) if total.isdigit() else None
         else:
-            full_url = BASE_URL.rstrip("/") + "/" + latest_pdf_link
+            offset = 0
+            mode = "wb"
+            length = response.headers.get("Content-Length", "")
+            expected_size = int(length) if length.isdigit() else None
+            files[filename] = {"url": full_url, "etag": response.headers.get("ETag")}
+            _save_index_cache(save_dir, cache)
+
+        size = offset
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+
+    with open(part_path, "rb") as f:
+        is_pdf = f.read(5) == b"%PDF-"
+    if (expected_size is not None and size != expected_size) or not is_pdf:
+        os.remove(part_path)
+        raise ValueError(
+            f"Telechargement corrompu: {size} octets recus, {expected_size} attendus"
+        )
+
+    os.replace(part_path, local_path)
+    files[filename].update(size=size, sha256=digest.hexdigest())
+    _save_index_cache(save_dir, cache)
+
+
+def _locate_latest_report(save_dir: str, cache: dict) -> tuple[str, str]:
+    pdf_links = _fetch_report_links(save_dir, cache)
+    if not pdf_links:
+        raise LookupError("Aucun lien PDF trouve")
+    return _resolve_report_link(pdf_links[0])
+
+
+def _fetch_report(
+    full_url: str, filename: str, save_dir: str, cache: dict
+) -> tuple[str, str]:
+    local_path = os.path.join(save_dir, filename)
+    entry = cache.get("files", {}).get(filename)
+
+    if _is_verified_download(local_path, entry):
+        logger.info("PDF deja present et verifie: %s", filename)
+    elif entry is None and _adopt_local_pdf(full_url, local_path, save_dir, cache):
+        logger.info("PDF deja present, empreinte enregistree: %s", filename)
+    else:
+        _download_pdf(full_url, local_path, save_dir, cache)
+        logger.info("PDF telecharge: %s", filename)
 
-        if "?filename=" in full_url:
-            filename = full_url.split("?filename=")[-1]
-        else:
-            filename = os.path.basename(full_url)
+    report_date = _extract_report_date(filename, local_path, full_url)
+    if report_date is None:
+        raise ValueError(f"Date du rapport introuvable: {filename}")
+    return local_path, report_date
 
-        local_path = os.path.join(save_dir, filename)
 
-        pdf_response = requests.get(full_url, stream=True, timeout=60)
-        pdf_response.raise_for_status()
+def _is_newer_report(
+    report_date: str, latest_year: int | None, latest_month: int | None
+) -> bool:
+    date_obj = datetime.strptime(report_date, "%Y-%m")
+    if latest_year is None or latest_month is None:
+        return True
+    return (date_obj.year, date_obj.month) > (latest_year, latest_month)
 
-        with open(local_path, "wb") as f:
-            for chunk in pdf_response.iter_content(chunk_size=8192):
-                f.write(chunk)
 
-        report_date = _extract_report_date(filename, local_path, full_url)
-        logger.info("PDF telecharge: %s (date: %s)", filename, report_date)
-        return local_path, report_date
+def download_latest_report(save_dir: str | None = None) -> tuple[str | None, str]:
+    if save_dir is None:
+        save_dir = PDF_REPORTS_DIR
+    os.makedirs(save_dir, exist_ok=True)
 
+    try:
+        cache = _load_index_cache(save_dir)
+        full_url, filename = _locate_latest_report(save_dir, cache)
+        local_path, report_date = _fetch_report(full_url, filename, save_dir, cache)
+        logger.info("PDF disponible: %s (date: %s)", filename, report_date)
+        return local_path, report_date
     except Exception as e:
         logger.error("Erreur telechargement: %s", e)
         return None, str(e)
 
 
-def check_for_new_report(data_manager) -> bool:
-    latest_year, latest_month = data_manager.get_latest_report_date()
-    pdf_path, report_date = download_latest_report()
-    if not pdf_path:
-        return False
+def fetch_new_report(
+    latest_year: int | None, latest_month: int | None, save_dir: str | None = None
+) -> tuple[str | None, str | None]:
+    if save_dir is None:
+        save_dir = PDF_REPORTS_DIR
+    os.makedirs(save_dir, exist_ok=True)
 
+    cache = _load_index_cache(save_dir)
+    full_url, filename = _locate_latest_report(save_dir, cache)
+    announced_date = _report_date_from_name(filename)
+    if announced_date and not _is_newer_report(
+        announced_date, latest_year, latest_month
+    ):
+        logger.info("Rapport %s deja en base, pas de telechargement", announced_date)
+        return None, None
+    pdf_path, report_date = _fetch_report(full_url, filename, save_dir, cache)
+    if not _is_newer_report(report_date, latest_year, latest_month):
+        logger.info("Rapport %s deja en base", report_date)
+        return None, None
+    return pdf_path, report_date
+
+
+def check_for_new_report(data_manager, on_progress=None) -> bool:
+    latest_year, latest_month = data_manager.get_latest_report_date()
+    if on_progress:
+        on_progress(0.0, "Recherche du dernier rapport...")
     try:
-        date_obj = datetime.strptime(report_date, "%Y-%m")
-        year, month = date_obj.year, date_obj.month
-    except ValueError:
-        logger.error("Format date invalide: %s", report_date)
+        pdf_path, report_date = fetch_new_report(latest_year, latest_month)
+    except ValueError as e:
+        logger.error("Format date invalide: %s", e)
+        return False
+    except Exception as e:
+        logger.error("Erreur telechargement: %s", e)
+        return False
+    if not pdf_path:
         return False
 
-    if latest_year is not None and latest_month is not None:
-        if year < latest_year or (year == latest_year and month <= latest_month):
-            return False
-
-    extracted_data = extract_data_from_pdf(pdf_path)
+    extracted_data = extract_data_from_pdf(pdf_path, on_progress=on_progress)
     confidence = extracted_data.get("confidence_score", 0.5)
     method = extracted_data.get("method", "pdfplumber")
 
@@ -345,11 +867,13 @@ def check_for_new_report(data_manager) -> bool:
     )
 
 
-def force_download_latest_report(data_manager) -> bool:
+def force_download_latest_report(data_manager, on_progress=None) -> bool:
+    if on_progress:
+        on_progress(0.0, "Telechargement du dernier rapport...")
     pdf_path, report_date = download_latest_report()
     if not pdf_path:
         return False
-    extracted_data = extract_data_from_pdf(pdf_path)
+    extracted_data = extract_data_from_pdf(pdf_path, on_progress=on_progress)
     confidence = extracted_data.get("confidence_score", 0.5)
     method = extracted_data.get("method", "pdfplumber")
     return data_manager.add_report_data(
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Ré-extraction par lot des rapports PDF archivés (data/pdf_reports par défaut)."""
+
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+import resource
+import multiprocessing
+from multiprocessing.connection import wait
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_processor import (
+    PDF_REPORTS_DIR,
+    UPLOAD_PREFIX,
+    extract_data_from_pdf,
+    _extract_report_date,
+)
+from db_adapter import EXTRACTED_DIR, write_report_csv
+
+SUMMARY_COLUMNS = [
+    ("file", "Fichier", 28),
+    ("report_date", "Date", 8),
+    ("pages", "Pages", 5),
+    ("seconds", "Durée s", 8),
+    ("pages_per_sec", "Pages/s", 7),
+    ("extracted", "Extraites", 9),
+    ("announced", "Annoncées", 9),
+    ("confidence", "Confiance", 9),
+    ("method", "Moteur", 10),
+    ("status", "Statut", 10),
+]
+
+
+def _collect_pdfs(sources: list[str], include_uploads: bool = False) -> list[str]:
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            matches = glob.glob(os.path.join(source, "*.pdf"))
+        else:
+            matches = glob.glob(source)
+        paths.extend(m for m in matches if m.lower().endswith(".pdf"))
+    paths = sorted(set(paths))
+    if not include_uploads:
+        uploads = [p for p in paths if os.path.basename(p).startswith(UPLOAD_PREFIX)]
+        if uploads:
+            logger.info("%d PDF importés ignorés (--include-uploads)", len(uploads))
+        paths = [p for p in paths if p not in uploads]
+    return paths
+
+
+def _extract_worker(pdf_path: str, engine: str, max_memory_mb: int, conn) -> None:
+    if max_memory_mb:
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    started = time.perf_counter()
+    try:
+        result = extract_data_from_pdf(pdf_path, engine=engine)
+        result["report_date"] = _extract_report_date(
+            os.path.basename(pdf_path), pdf_path, ""
+        )
+        result["seconds"] = time.perf_counter() - started
+        conn.send(result)
+    except MemoryError:
+        conn.send({"error": "mémoire"})
+    except Exception as e:
+        conn.send({"error": str(e)})
+    finally:
+        conn.close()
+
+
+def _file_summary(pdf_path: str, result: dict, status: str) -> dict:
+    pages = result.get("page_count", 0)
+    seconds = result.get("seconds", 0.0)
+    return {
+        "file": os.path.basename(pdf_path),
+        "path": pdf_path,
+        "report_date": result.get("report_date") or "",
+        "pages": pages,
+        "seconds": round(seconds, 2),
+        "pages_per_sec": round(pages / seconds, 2) if seconds > 0 else 0.0,
+        "extracted": len(result.get("suspicions", [])),
+        "announced": result.get("total_suspicions", 0),
+        "confidence": round(result.get("confidence_score", 0.0), 3),
+        "method": result.get("method", ""),
+        "status": status,
+    }
+
+
+def run_batch(
+    pdf_paths: list[str],
+    workers: int,
+    timeout: float,
+    max_memory_mb: int,
+    output_dir: str,
+    engine: str = "auto",
+    dry_run: bool = False,
+) -> list[dict]:
+    ctx = multiprocessing.get_context("spawn")
+    pending = list(pdf_paths)
+    running = {}
+    summaries = []
+
+    extracted = {}
+
+    def finish(pdf_path: str, result: dict, status: str) -> None:
+        summary = _file_summary(pdf_path, result, status)
+        if status == "ok" and not summary["extracted"]:
+            summary["status"] = "vide"
+        elif status == "ok" and not summary["report_date"]:
+            summary["status"] = "sans date"
+        elif status == "ok":
+            extracted.setdefault(summary["report_date"], []).append(
+                (summary, result["suspicions"])
+            )
+        logger.info("%s: %s", summary["file"], summary["status"])
+        summaries.append(summary)
+
+    while pending or running:
+        while pending and len(running) < workers:
+            pdf_path = pending.pop(0)
+            recv_conn, send_conn = ctx.Pipe(duplex=False)
+            proc = ctx.Process(
+                target=_extract_worker,
+                args=(pdf_path, engine, max_memory_mb, send_conn),
+                daemon=True,
+            )
+            proc.start()
+            send_conn.close()
+            running[recv_conn] = (pdf_path, proc, time.monotonic())
+
+        ready = wait(list(running), timeout=0.2)
+        for conn in list(running):
+            pdf_path, proc, started = running[conn]
+            if conn in ready:
+                try:
+                    result = conn.recv()
+                except EOFError:
+                    proc.join()
+                    result = {"error": f"arrêt (code {proc.exitcode})"}
+                proc.join()
+                status = "ok" if "error" not in result else result["error"]
+            elif time.monotonic() - started > timeout:
+                proc.kill()
+                proc.join()
+                result, status = {"seconds": timeout}, "timeout"
+            else:
+                continue
+            conn.close()
+            del running[conn]
+            finish(pdf_path, result, status)
+
+    for report_date, candidates in sorted(extracted.items()):
+        candidates.sort(key=lambda c: (-c[0]["confidence"], c[0]["file"]))
+        (kept, suspicions), *duplicates = candidates
+        if duplicates:
+            logger.warning(
+                "Plusieurs PDF pour %s: %s conservé (confiance %.2f), ignorés: %s",
+                report_date,
+                kept["file"],
+                kept["confidence"],
+                ", ".join(d["file"] for d, _ in duplicates),
+            )
+            for duplicate, _ in duplicates:
+                duplicate["status"] = "doublon"
+        if not dry_run:
+            kept["csv"] = write_report_csv(report_date, suspicions, output_dir)
+
+    return sorted(summaries, key=lambda s: s["file"])
+
+
+def _print_summary(summaries: list[dict]) -> None:
+    header = " ".join(f"{label:<{width}}" for _, label, width in SUMMARY_COLUMNS)
+    print(header)
+    print("-" * len(header))
+    for summary in summaries:
+        print(
+            " ".join(
+                f"{str(summary[key])[:width]:<{width}}"
+                for key, _, width in SUMMARY_COLUMNS
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        default=[PDF_REPORTS_DIR],
+        help="Dossiers ou motifs glob de PDF (défaut: data/pdf_reports)",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--timeout", type=float, default=300, help="Délai max par fichier (s)"
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=int,
+        default=2048,
+        help="Mémoire max par processus en Mo (0 = illimitée)",
+    )
+    parser.add_argument(
+        "--engine", choices=["auto", "pypdf2", "pdfplumber"], default="auto"
+    )
+    parser.add_argument("--output-dir", default=EXTRACTED_DIR)
+    parser.add_argument("--report", help="Chemin du rapport JSON à écrire")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Extraire sans écrire les CSV"
+    )
+    parser.add_argument(
+        "--include-uploads",
+        action="store_true",
+        help=f"Inclure les PDF importés depuis l'application ({UPLOAD_PREFIX}*.pdf)",
+    )
+    args = parser.parse_args()
+
+    pdf_paths = _collect_pdfs(args.sources, args.include_uploads)
+    if not pdf_paths:
+        logger.error("Aucun PDF trouvé dans %s", args.sources)
+        sys.exit(1)
+    logger.info("%d PDF à extraire avec %d processus", len(pdf_paths), args.workers)
+
+    started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    started = time.perf_counter()
+    summaries = run_batch(
+        pdf_paths,
+        workers=max(args.workers, 1),
+        timeout=args.timeout,
+        max_memory_mb=args.max_memory,
+        output_dir=args.output_dir,
+        engine=args.engine,
+        dry_run=args.dry_run,
+    )
+    _print_summary(summaries)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "started_at": started_at,
+                    "total_seconds": round(time.perf_counter() - started, 2),
+                    "workers": args.workers,
+                    "timeout": args.timeout,
+                    "max_memory_mb": args.max_memory,
+                    "engine": args.engine,
+                    "files": summaries,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        logger.info("Rapport JSON écrit: %s", args.report)
+
+    if any(s["status"] not in ("ok", "vide", "doublon") for s in summaries):
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
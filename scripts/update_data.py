@@ -2,45 +2,44 @@
 """Script de mise à jour des données — appelé par GitHub Actions ou manuellement."""
 
 import os
+import re
 import sys
+import glob
+import time
 import logging
+import argparse
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from pdf_processor import download_latest_report, extract_data_from_pdf
-from db_adapter import DataManager
+from pdf_processor import fetch_new_report, extract_data_from_pdf
+from db_adapter import (
+    EXTRACTED_DIR,
+    latest_report_date,
+    ingest_report,
+    is_csv_ingested,
+    mark_csv_ingested,
+    read_report_csv,
+)
 
 
-def main():
-    logger.info("Début de la mise à jour des données")
-    dm = DataManager()
-    latest_year, latest_month = dm.get_latest_report_date()
-    logger.info("Dernier rapport en base: %s-%s", latest_year, latest_month)
+def update_once() -> str | None:
+    latest_year, latest_month = latest_report_date()
+    logger.info("Dernier rapport connu: %s-%s", latest_year, latest_month)
+
+    try:
+        pdf_path, report_date = fetch_new_report(latest_year, latest_month)
+    except Exception as e:
+        raise RuntimeError(f"Échec du téléchargement: {e}") from e
 
-    pdf_path, report_date = download_latest_report()
     if not pdf_path:
-        logger.error("Échec du téléchargement: %s", report_date)
-        sys.exit(1)
+        logger.info("Aucun nouveau rapport, rien à faire")
+        return None
 
     logger.info("PDF téléchargé: %s (date: %s)", pdf_path, report_date)
 
-    from datetime import datetime
-
-    try:
-        date_obj = datetime.strptime(report_date, "%Y-%m")
-        year, month = date_obj.year, date_obj.month
-    except ValueError:
-        logger.error("Format de date invalide: %s", report_date)
-        sys.exit(1)
-
-    if latest_year is not None and latest_month is not None:
-        if year < latest_year or (year == latest_year and month <= latest_month):
-            logger.info("Rapport %s-%s déjà en base, rien à faire", year, month)
-            return
-
     extracted_data = extract_data_from_pdf(pdf_path)
     confidence = extracted_data.get("confidence_score", 0.5)
     method = extracted_data.get("method", "pdfplumber")
@@ -51,19 +50,129 @@ def main():
         confidence * 100,
     )
 
-    success = dm.add_report_data(
+    if not ingest_report(
         report_date,
         pdf_path,
         extracted_data,
         confidence_score=confidence,
         extraction_method=method,
+    ):
+        raise RuntimeError("Échec de l'ingestion")
+    return report_date
+
+
+def _scan_extracted(extracted_dir: str) -> dict[str, int]:
+    mtimes = {}
+    for path in glob.glob(os.path.join(extracted_dir, "report_*.csv")):
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            pass
+    return mtimes
+
+
+def _ingest_dropped_csv(csv_path: str) -> None:
+    match = re.match(r"report_(\d{4}-\d{2})\.csv$", os.path.basename(csv_path))
+    if not match:
+        return
+    if is_csv_ingested(csv_path):
+        logger.debug("CSV déjà ingéré, ignoré: %s", csv_path)
+        return
+    try:
+        suspicions = read_report_csv(csv_path)
+    except Exception as e:
+        logger.error("Lecture impossible de %s: %s", csv_path, e)
+        return
+    logger.info("CSV déposé: %s (%d lignes)", csv_path, len(suspicions))
+    if ingest_report(
+        match.group(1),
+        csv_path,
+        {"suspicions": suspicions, "total_suspicions": len(suspicions)},
+        extraction_method="csv",
+        write_csv=False,
+    ):
+        mark_csv_ingested(csv_path)
+
+
+def watch(
+    interval: float, scan_interval: float, retry_delay: float, extracted_dir: str
+) -> None:
+    logger.info(
+        "Mode veille: site UE toutes les %.0fs, %s toutes les %.0fs",
+        interval,
+        extracted_dir,
+        scan_interval,
     )
+    known = _scan_extracted(extracted_dir)
+    next_poll = time.monotonic()
+    failures = 0
+
+    while True:
+        if time.monotonic() >= next_poll:
+            try:
+                report_date = update_once()
+                failures = 0
+                next_poll = time.monotonic() + interval
+                if report_date:
+                    csv_path = os.path.join(extracted_dir, f"report_{report_date}.csv")
+                    if os.path.exists(csv_path):
+                        known[csv_path] = os.stat(csv_path).st_mtime_ns
+            except Exception as e:
+                failures += 1
+                delay = min(retry_delay * 2 ** (failures - 1), interval)
+                next_poll = time.monotonic() + delay
+                logger.error(
+                    "%s — nouvel essai dans %.0fs (échec n°%d)", e, delay, failures
+                )
+
+        current = _scan_extracted(extracted_dir)
+        for path, mtime in sorted(current.items()):
+            if known.get(path) != mtime:
+                _ingest_dropped_csv(path)
+        known = current
+        time.sleep(scan_interval)
 
-    if success:
-        logger.info("Mise à jour réussie !")
-    else:
-        logger.error("Échec de la mise à jour")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--watch", action="store_true", help="Tourner en continu (mode veille)"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=6 * 3600,
+        help="Intervalle entre deux vérifications du site UE (s)",
+    )
+    parser.add_argument(
+        "--scan-interval",
+        type=float,
+        default=30,
+        help="Intervalle de scan de data/extracted (s)",
+    )
+    parser.add_argument(
+        "--retry-delay",
+        type=float,
+        default=60,
+        help="Premier délai de reprise après échec, doublé à chaque échec (s)",
+    )
+    args = parser.parse_args()
+
+    if args.watch:
+        try:
+            watch(args.interval, args.scan_interval, args.retry_delay, EXTRACTED_DIR)
+        except KeyboardInterrupt:
+            logger.info("Arrêt du mode veille")
+        return
+
+    logger.info("Début de la mise à jour des données")
+    try:
+        report_date = update_once()
+    except RuntimeError as e:
+        logger.error("%s", e)
         sys.exit(1)
+    if report_date:
+        logger.info("Mise à jour réussie !")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+@pytest.fixture(scope="session")
+def data_manager(tmp_path_factory):
+    from db_adapter import DataManager
+
+    return DataManager(str(tmp_path_factory.mktemp("db") / "database.sqlite"))
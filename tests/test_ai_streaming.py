@@ -0,0 +1,126 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import ai_analyzer
+
+TOKENS = ["Les ", "fraudes ", "augmentent", " — café/cacao."]
+
+
+def _chunk(choices: list) -> bytes:
+    payload = {
+        "id": "chunk",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": ai_analyzer.MISTRAL_MODEL,
+        "choices": choices,
+    }
+    if not choices:
+        payload["usage"] = {
+            "prompt_tokens": 10,
+            "completion_tokens": 4,
+            "total_tokens": 14,
+        }
+    return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+
+class FakeMistral(BaseHTTPRequestHandler):
+    requests: list = []
+    status = 200
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        FakeMistral.requests.append(body)
+        if FakeMistral.status != 200:
+            self.send_response(FakeMistral.status)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b'{"message": "Unauthorized"}')
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        self.wfile.write(b": keep-alive\n\n")
+        self.wfile.write(_chunk([]))
+        for token in TOKENS:
+            self.wfile.write(
+                _chunk(
+                    [
+                        {
+                            "index": 0,
+                            "delta": {"role": "assistant", "content": token},
+                            "finish_reason": None,
+                        }
+                    ]
+                )
+            )
+            self.wfile.flush()
+        self.wfile.write(_chunk([]))
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+@pytest.fixture
+def fake_server(monkeypatch, tmp_path):
+    FakeMistral.requests = []
+    FakeMistral.status = 200
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeMistral)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        ai_analyzer, "MISTRAL_SERVER_URL", f"http://127.0.0.1:{server.server_port}"
+    )
+    monkeypatch.setattr(ai_analyzer, "CACHE_PATH", str(tmp_path / "ai_cache.sqlite"))
+    yield FakeMistral
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["sdk", "requests"])
+def client_path(request, monkeypatch):
+    if request.param == "sdk":
+        if ai_analyzer._mistral_client_class() is None:
+            pytest.skip("SDK mistralai non installe")
+    else:
+        monkeypatch.setattr(ai_analyzer, "_mistral_client_class", lambda: None)
+    return request.param
+
+
+@pytest.fixture
+def data(data_manager):
+    return data_manager.data.head(200)
+
+
+def test_stream_yields_tokens_and_fills_cache(fake_server, client_path, data):
+    chunks = list(ai_analyzer.stream_with_mistral("cle", "Tendances ?", data))
+
+    assert chunks == TOKENS
+    assert fake_server.requests[0]["stream"] is True
+    key = ai_analyzer.cache_key("Tendances ?", data)
+    assert ai_analyzer.cache_get(key) == "".join(TOKENS)
+
+    again = list(ai_analyzer.stream_with_mistral("cle", "  tendances ? ", data))
+    assert again == ["".join(TOKENS)]
+    assert len(fake_server.requests) == 1
+
+
+def test_stream_error_raises_and_is_not_cached(fake_server, client_path, data):
+    fake_server.status = 401
+
+    with pytest.raises(RuntimeError, match="Erreur lors de l'analyse IA"):
+        list(ai_analyzer.stream_with_mistral("cle", "Tendances ?", data))
+
+    assert ai_analyzer.cache_get(ai_analyzer.cache_key("Tendances ?", data)) is None
+
+
+def test_stream_rejects_missing_inputs(fake_server, data):
+    with pytest.raises(ValueError):
+        list(ai_analyzer.stream_with_mistral("", "Tendances ?", data))
+    with pytest.raises(ValueError):
+        list(ai_analyzer.stream_with_mistral("cle", "Tendances ?", data.head(0)))
+    assert fake_server.requests == []
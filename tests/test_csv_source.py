@@ -0,0 +1,38 @@
+import pytest
+
+from db_adapter import _latest_csv_source_date, _load_csv_source
+
+HEADER = "ID;Année;Mois;Date;Pays;CATPROD;Produit;CATFRAU;OBJETFRAU;LINKSOURCE\n"
+
+
+@pytest.mark.parametrize(
+    "encoding, rows, expected",
+    [
+        (
+            "utf-8-sig",
+            [
+                "A1;2024;mars;15/03/2024;Italy;Wine;wine;Counterfeit;x;",
+                "A2;2024;mai;02/11/2024;Spain;Fish;tuna;Grey market;y;",
+            ],
+            (2024, 11),
+        ),
+        (
+            "latin-1",
+            [
+                "A1;2023;déc.;;Italy;Wine;wine;Counterfeit;x;",
+                "A2;2024;févr.;;Spain;Fish;tuna;Grey market;y;",
+            ],
+            (2024, 2),
+        ),
+    ],
+)
+def test_latest_date_matches_loaded_source(tmp_path, encoding, rows, expected):
+    csv_path = tmp_path / "source.csv"
+    csv_path.write_bytes((HEADER + "\n".join(rows) + "\n").encode(encoding))
+
+    loaded = _load_csv_source(str(csv_path))
+
+    assert list(loaded["source_id"]) == ["A1", "A2"]
+    latest = max(zip(loaded["report_year"], loaded["report_month"]))
+    assert _latest_csv_source_date(str(csv_path)) == tuple(map(int, latest))
+    assert _latest_csv_source_date(str(csv_path)) == expected
@@ -0,0 +1,32 @@
+import io
+
+import pandas as pd
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from db_adapter import EXPORT_COLUMNS, EXPORT_FORMATS
+
+READERS = {
+    "csv": pd.read_csv,
+    "xlsx": pd.read_excel,
+    "parquet": pd.read_parquet,
+}
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_export_goes_through_download_path(data_manager, fmt):
+    filters = data_manager.default_filters()
+    data = data_manager.export_details(filters, fmt)
+
+    payload, _ = convert_data_to_bytes_and_infer_mime(
+        data, unsupported_error=RuntimeError("type non supporte")
+    )
+
+    exported = READERS[fmt](io.BytesIO(payload))
+    assert list(exported.columns) == EXPORT_COLUMNS
+    assert len(exported) == data_manager.count_details(filters)
+
+
+def test_unknown_export_format(data_manager):
+    with pytest.raises(ValueError):
+        data_manager.export_details(data_manager.default_filters(), "ods")
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+import pdf_processor
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks")
+)
+
+from synthetic_report import generate_report
+
+URL = "https://example.invalid/report_202403.pdf"
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        pdf_processor, "_download_pdf", lambda *args: calls.append(args)
+    )
+    return calls
+
+
+def test_existing_pdf_without_cache_entry_is_adopted(tmp_path, downloads):
+    local_path = tmp_path / "report_202403.pdf"
+    generate_report(str(local_path), n_suspicions=5, month=3, seed=0)
+    cache = {}
+
+    path, report_date = pdf_processor._fetch_report(
+        URL, local_path.name, str(tmp_path), cache
+    )
+
+    assert downloads == []
+    assert (path, report_date) == (str(local_path), "2024-03")
+    entry = cache["files"][local_path.name]
+    assert entry["size"] == local_path.stat().st_size
+    assert entry["sha256"] == pdf_processor._file_sha256(str(local_path))
+    assert pdf_processor._load_index_cache(str(tmp_path)) == cache
+
+
+def test_truncated_pdf_is_downloaded_again(tmp_path, downloads):
+    local_path = tmp_path / "report_202403.pdf"
+    generate_report(str(local_path), n_suspicions=5, month=3, seed=0)
+    local_path.write_bytes(local_path.read_bytes()[:2000])
+
+    pdf_processor._fetch_report(URL, local_path.name, str(tmp_path), {})
+
+    assert len(downloads) == 1
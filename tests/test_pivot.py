@@ -0,0 +1,50 @@
+import pandas as pd
+
+from db_adapter import DataManager, bump_generation
+from utils import count_matrix
+
+
+def _filtered(data_manager):
+    return data_manager.filter_data(**data_manager.default_filters())
+
+
+def test_pivot_matches_count_matrix(data_manager):
+    filtered = _filtered(data_manager)
+    pivot = data_manager.pivot(filtered, "product_category", "fraud_category", 5, 4)
+    expected = count_matrix(
+        filtered["product_category"], filtered["fraud_category"], 5, 4
+    )
+    pd.testing.assert_frame_equal(pivot, expected, check_dtype=False)
+
+
+def test_pivot_rows_outside_current_generation(data_manager):
+    filtered = _filtered(data_manager).head(50)
+    stale = filtered.set_axis(filtered.index + len(data_manager.data))
+    pivot = data_manager.pivot(stale, "product_category", "fraud_category")
+    expected = count_matrix(stale["product_category"], stale["fraud_category"])
+    pd.testing.assert_frame_equal(pivot, expected, check_dtype=False)
+    assert pivot.to_numpy().sum() == len(stale)
+
+
+def test_pivot_after_partition_reload_reorders_rows(tmp_path):
+    dm = DataManager(str(tmp_path / "database.sqlite"))
+    dm.generation_file = str(tmp_path / "generation.json")
+    category = dm.data["product_category"].value_counts().index[0]
+    filtered = dm.filter_data(categories=[category])
+
+    bump_generation([dm.data["date"].iloc[0]], dm.generation_file)
+    reordered = dm.data
+    assert not reordered.loc[filtered.index, "product_category"].eq(category).all()
+
+    pivot = dm.pivot(filtered, "origin", "fraud_type", 10, 5, fingerprint="f")
+    expected = count_matrix(filtered["origin"], filtered["fraud_type"], 10, 5)
+    pd.testing.assert_frame_equal(pivot, expected, check_dtype=False)
+
+    fresh = dm.filter_data(categories=[category])
+    pivot = dm.pivot(fresh, "origin", "fraud_type", fingerprint="f")
+    expected = count_matrix(fresh["origin"], fresh["fraud_type"])
+    pd.testing.assert_frame_equal(
+        pivot.sort_index().sort_index(axis=1),
+        expected.sort_index().sort_index(axis=1),
+        check_dtype=False,
+    )
@@ -0,0 +1,32 @@
+import threading
+
+import pytest
+
+import db_adapter
+
+SUSPICIONS = {"suspicions": [{"product_category": "Fish", "issue": "Etiquetage"}]}
+
+
+def test_ingest_waits_behind_slow_task(monkeypatch, tmp_path):
+    monkeypatch.setattr(db_adapter, "WRITE_WAIT_LOG", 0.05)
+    release = threading.Event()
+    blocker = db_adapter.submit_task(release.wait, 5)
+    threading.Timer(0.3, release.set).start()
+
+    assert db_adapter.ingest_report(
+        "2024-03",
+        "rapport.pdf",
+        SUSPICIONS,
+        db_path=str(tmp_path / "database.sqlite"),
+        extracted_dir=str(tmp_path / "extracted"),
+    )
+    assert blocker.result() is True
+    assert (tmp_path / "extracted" / "report_2024-03.csv").exists()
+
+
+def test_wait_fails_when_writer_stops(monkeypatch):
+    monkeypatch.setattr(db_adapter, "WRITE_WAIT_LOG", 0.05)
+    monkeypatch.setattr(db_adapter, "_writer", None)
+
+    with pytest.raises(RuntimeError, match="arrêté"):
+        db_adapter._wait_write(db_adapter.Future())
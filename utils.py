@@ -1,5 +1,9 @@
 import re
 import logging
+import unicodedata
+from functools import lru_cache
+import numpy as np
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
@@ -206,6 +210,31 @@ ISO_COUNTRY_CODES = {
     "Republic of Côte d'Ivoire": "CIV",
 }
 
+COUNTRY_ALIASES = {
+    "Ivory Coast": "CIV",
+    "Hong Kong": "HKG",
+    "French Guiana": "GUF",
+    "Scotland": "GBR",
+    "England": "GBR",
+    "Wales": "GBR",
+    "Great Britain": "GBR",
+    "United States of America": "USA",
+    "US": "USA",
+    "Kingdom of Bhutan": "BTN",
+    "Democratic Republic of the Congo": "COD",
+    "DR Congo": "COD",
+    "Russian Federation": "RUS",
+    "Viet Nam": "VNM",
+    "Republic of Türkiye": "TUR",
+    "Turkiye": "TUR",
+    "The Netherlands": "NLD",
+    "Holland": "NLD",
+    "Korea": "KOR",
+    "Iran (Islamic Republic of)": "IRN",
+    "Macedonia": "MKD",
+    "Taiwan": "TWN",
+}
+
 MONTH_FR = {
     "janv": "Janvier",
     "févr": "Février",
@@ -222,10 +251,138 @@ MONTH_FR = {
 }
 
 
+def _fold_country_name(name: str) -> str:
+    text = str(name)
+    try:
+        text = text.encode("latin-1").decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        pass
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9]+", " ", text.casefold()).strip()
+    return re.sub(r"^the ", "", text)
+
+
+_COUNTRY_INDEX = {
+    _fold_country_name(name): code
+    for name, code in {**ISO_COUNTRY_CODES, **COUNTRY_ALIASES}.items()
+}
+
+
+@lru_cache(maxsize=None)
 def get_country_code(country_name: str) -> str:
     if not country_name:
         return ""
-    return ISO_COUNTRY_CODES.get(country_name.strip(), "")
+    return _COUNTRY_INDEX.get(_fold_country_name(country_name), "")
+
+
+def country_codes(origins: pd.Series) -> pd.Series:
+    mapping = {name: get_country_code(name) for name in origins.dropna().unique()}
+    return origins.map(mapping).fillna("")
+
+
+def log_unmapped_origins(origins: pd.Series, codes: pd.Series) -> None:
+    unmapped = origins[
+        (codes == "") & origins.fillna("").astype(str).str.strip().ne("")
+    ]
+    if unmapped.empty:
+        return
+    counts = unmapped.value_counts()
+    logger.warning(
+        "%d origine(s) sans code ISO (%d lignes): %s",
+        len(counts),
+        int(counts.sum()),
+        ", ".join(f"{name!r} ({n})" for name, n in counts.head(20).items()),
+    )
+
+
+OTHERS_LABEL = "Autres"
+
+
+def bucket_top(counts: pd.Series, top_n: int | None) -> pd.Series:
+    counts = counts.sort_values(ascending=False)
+    if top_n is None or len(counts) <= top_n:
+        return counts
+    others = counts.iloc[top_n:].sum()
+    counts = counts.iloc[:top_n]
+    if others:
+        counts = pd.concat(
+            [counts, pd.Series({OTHERS_LABEL: others}, name=counts.name)]
+        )
+    return counts
+
+
+def _has_label(values: pd.Series) -> pd.Series:
+    return values.notna() & (values.astype(str).str.strip() != "")
+
+
+def count_values(values: pd.Series, top_n: int | None = None) -> pd.Series:
+    values = values[_has_label(values)]
+    counts = values.value_counts().rename("count")
+    return bucket_top(counts, top_n).rename_axis(values.name)
+
+
+def label_codes(values: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    codes, labels = pd.factorize(values.where(_has_label(values)))
+    return codes, pd.Index(labels, name=values.name)
+
+
+def _top_codes(codes: np.ndarray, n_labels: int, top_n: int | None):
+    totals = np.bincount(codes, minlength=n_labels)
+    order = np.argsort(-totals, kind="stable")
+    order = order[totals[order] > 0]
+    keep = order[:top_n] if top_n is not None else order
+    remap = np.full(n_labels, len(keep), dtype=np.int64)
+    remap[keep] = np.arange(len(keep))
+    has_others = len(order) > len(keep)
+    return remap[codes], keep, has_others
+
+
+def pivot_codes(
+    row_codes: np.ndarray,
+    row_labels: pd.Index,
+    col_codes: np.ndarray,
+    col_labels: pd.Index,
+    top_rows: int | None = None,
+    top_cols: int | None = None,
+) -> pd.DataFrame:
+    valid = (row_codes >= 0) & (col_codes >= 0)
+    if not valid.any():
+        return pd.DataFrame()
+    rows, row_keep, row_others = _top_codes(row_codes[valid], len(row_labels), top_rows)
+    cols, col_keep, col_others = _top_codes(col_codes[valid], len(col_labels), top_cols)
+    n_rows, n_cols = len(row_keep) + row_others, len(col_keep) + col_others
+    counts = np.bincount(rows * n_cols + cols, minlength=n_rows * n_cols)
+    index = list(row_labels[row_keep]) + [OTHERS_LABEL] * row_others
+    columns = list(col_labels[col_keep]) + [OTHERS_LABEL] * col_others
+    return pd.DataFrame(
+        counts.reshape(n_rows, n_cols),
+        index=pd.Index(index, name=row_labels.name),
+        columns=pd.Index(columns, name=col_labels.name),
+    )
+
+
+def count_matrix(
+    rows: pd.Series,
+    cols: pd.Series,
+    top_rows: int | None = None,
+    top_cols: int | None = None,
+) -> pd.DataFrame:
+    return pivot_codes(*label_codes(rows), *label_codes(cols), top_rows, top_cols)
+
+
+def count_by_country(data: pd.DataFrame) -> pd.DataFrame:
+    if "origin_iso3" in data.columns:
+        iso_codes = data["origin_iso3"].fillna("")
+    else:
+        iso_codes = country_codes(data["origin"])
+    mapped = data[["origin"]].assign(iso_code=iso_codes)
+    mapped = mapped[mapped["iso_code"] != ""]
+    return (
+        mapped.groupby("iso_code")
+        .agg(country=("origin", "first"), count=("origin", "size"))
+        .reset_index()
+    )
 
 
 def format_date_display(date_str: str) -> str:
@@ -263,31 +420,48 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
+FRAUD_CATEGORY_KEYWORDS = [
+    (
+        "Résidus chimiques",
+        ["pesticide", "residue", "mrl", "chlorpyrifos", "chemical"],
+    ),
+    ("Additifs non conformes", ["additive", "colorant", "e 1", "e 2", "e 3"]),
+    (
+        "Problèmes documentaires",
+        ["origin", "document", "certificate", "label", "traceability"],
+    ),
+    ("Substances non autorisées", ["unauthorized", "not authorized", "illegal"]),
+    ("Adultération", ["substitution", "adulteration"]),
+    (
+        "Falsification / Étiquetage",
+        ["counterfeit", "misdescription", "mislabelling", "misbranding"],
+    ),
+    ("Marché gris / Contrebande", ["grey market", "smuggling", "contraband"]),
+    ("Faux documents", ["document forgery"]),
+]
+DEFAULT_FRAUD_CATEGORY = "Autres problèmes"
+
+_CATEGORY_PATTERNS = [
+    (name, re.compile("|".join(re.escape(kw) for kw in keywords)))
+    for name, keywords in FRAUD_CATEGORY_KEYWORDS
+]
+
+
+def categorize_fraud_issues(issues: pd.Series) -> pd.Series:
+    lowered = issues.fillna("").astype(str).str.lower()
+    conditions = [
+        lowered.str.contains(pattern).to_numpy(dtype=bool)
+        for _, pattern in _CATEGORY_PATTERNS
+    ]
+    names = [name for name, _ in _CATEGORY_PATTERNS]
+    return pd.Series(
+        np.select(conditions, names, DEFAULT_FRAUD_CATEGORY), index=issues.index
+    )
+
+
 def categorize_fraud_issue(issue: str) -> str:
     issue_lower = (issue or "").lower()
-    if any(
-        kw in issue_lower
-        for kw in ["pesticide", "residue", "mrl", "chlorpyrifos", "chemical"]
-    ):
-        return "Résidus chimiques"
-    if any(kw in issue_lower for kw in ["additive", "colorant", "e 1", "e 2", "e 3"]):
-        return "Additifs non conformes"
-    if any(
-        kw in issue_lower
-        for kw in ["origin", "document", "certificate", "label", "traceability"]
-    ):
-        return "Problèmes documentaires"
-    if any(kw in issue_lower for kw in ["unauthorized", "not authorized", "illegal"]):
-        return "Substances non autorisées"
-    if any(kw in issue_lower for kw in ["substitution", "adulteration"]):
-        return "Adultération"
-    if any(
-        kw in issue_lower
-        for kw in ["counterfeit", "misdescription", "mislabelling", "misbranding"]
-    ):
-        return "Falsification / Étiquetage"
-    if any(kw in issue_lower for kw in ["grey market", "smuggling", "contraband"]):
-        return "Marché gris / Contrebande"
-    if any(kw in issue_lower for kw in ["document forgery"]):
-        return "Faux documents"
-    return "Autres problèmes"
+    for name, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(issue_lower):
+            return name
+    return DEFAULT_FRAUD_CATEGORY
@@ -1,21 +1,38 @@
-import plotly.express as px
-import plotly.graph_objects as go
+from __future__ import annotations
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
 import pandas as pd
+from utils import count_by_country, count_values
 
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
-def create_fraud_by_category_chart(
-    data: pd.DataFrame, max_categories: int = 20
-) -> go.Figure:
-    if data is None or data.empty or "product_category" not in data.columns:
-        return go.Figure().update_layout(title="Données insuffisantes")
-    if data["product_category"].isna().all():
-        return go.Figure().update_layout(title="Aucune donnée de catégorie disponible")
+FIGURE_CACHE_SIZE = 64
 
-    category_counts = (
-        data["product_category"].value_counts().head(max_categories).reset_index()
-    )
-    category_counts.columns = ["category", "count"]
-    category_counts = category_counts.sort_values("count", ascending=True)
+_figure_cache: OrderedDict[tuple, str] = OrderedDict()
+_figure_cache_lock = threading.Lock()
+_figure_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _empty_figure(title: str) -> go.Figure:
+    import plotly.graph_objects as go
+
+    return go.Figure().update_layout(title=title)
+
+
+def create_fraud_by_category_chart(counts: pd.Series) -> go.Figure:
+    import plotly.express as px
+
+    if counts is None or counts.empty:
+        return _empty_figure("Aucune donnée de catégorie disponible")
+
+    category_counts = counts.rename_axis("category").reset_index(name="count")
+    category_counts = category_counts.iloc[::-1]
 
     fig = px.bar(
         category_counts,
@@ -27,24 +44,18 @@ def create_fraud_by_category_chart(
         color="count",
         color_continuous_scale=px.colors.sequential.Blues,
     )
-    fig.update_layout(
-        yaxis={"categoryorder": "total ascending"},
-        height=max(400, len(category_counts) * 28),
-    )
+    fig.update_layout(height=max(400, len(category_counts) * 28))
     fig.update_coloraxes(showscale=False)
     return fig
 
 
-def create_fraud_by_type_chart(data: pd.DataFrame) -> go.Figure:
-    if data is None or data.empty or "fraud_type" not in data.columns:
-        return go.Figure().update_layout(title="Données insuffisantes")
-    if data["fraud_type"].isna().all():
-        return go.Figure().update_layout(
-            title="Aucune donnée de type de fraude disponible"
-        )
+def create_fraud_by_type_chart(counts: pd.Series) -> go.Figure:
+    import plotly.express as px
 
-    fraud_counts = data["fraud_type"].value_counts().reset_index()
-    fraud_counts.columns = ["type", "count"]
+    if counts is None or counts.empty:
+        return _empty_figure("Aucune donnée de type de fraude disponible")
+
+    fraud_counts = counts.rename_axis("type").reset_index(name="count")
 
     fig = px.pie(
         fraud_counts,
@@ -62,21 +73,11 @@ def create_fraud_by_type_chart(data: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def create_country_choropleth(data: pd.DataFrame) -> go.Figure:
-    if data is None or data.empty or "origin" not in data.columns:
-        return go.Figure().update_layout(title="Données insuffisantes")
-
-    from utils import get_country_code
+def create_country_choropleth(country_counts: pd.DataFrame) -> go.Figure:
+    import plotly.express as px
 
-    country_counts = data["origin"].value_counts().reset_index()
-    country_counts.columns = ["country", "count"]
-    country_counts["iso_code"] = country_counts["country"].apply(get_country_code)
-    country_counts = country_counts[country_counts["iso_code"] != ""]
-
-    if country_counts.empty:
-        return go.Figure().update_layout(
-            title="Impossible de mapper les pays (codes ISO manquants)"
-        )
+    if country_counts is None or country_counts.empty:
+        return _empty_figure("Impossible de mapper les pays (codes ISO manquants)")
 
     fig = px.choropleth(
         country_counts,
@@ -92,48 +93,31 @@ def create_country_choropleth(data: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def create_origin_notifier_heatmap(data: pd.DataFrame) -> go.Figure:
-    if (
-        data is None
-        or data.empty
-        or "origin" not in data.columns
-        or "notified_by" not in data.columns
-    ):
-        return go.Figure().update_layout(title="Données insuffisantes")
-    if data["origin"].isna().all() or data["notified_by"].isna().all():
-        return go.Figure().update_layout(title="Données insuffisantes pour la heatmap")
-
-    try:
-        top_origins = data["origin"].value_counts().nlargest(15).index
-        top_notifiers = data["notified_by"].value_counts().nlargest(10).index
-        filtered = data[
-            data["origin"].isin(top_origins) & data["notified_by"].isin(top_notifiers)
-        ]
-
-        if filtered.empty:
-            return go.Figure().update_layout(title="Pas assez de données communes")
-
-        heatmap_data = pd.crosstab(filtered["origin"], filtered["notified_by"])
-        fig = px.imshow(
-            heatmap_data,
-            labels=dict(x="Pays notifiant", y="Pays d'origine", color="Nombre"),
-            color_continuous_scale=px.colors.sequential.Blues,
-            title="Relations pays d'origine / pays notifiant",
-        )
-        fig.update_layout(xaxis={"tickangle": 45}, height=600)
-        return fig
-    except Exception as e:
-        return go.Figure().update_layout(title=f"Erreur: {e}")
-
-
-def create_timeline_chart(data: pd.DataFrame) -> go.Figure:
-    if data is None or data.empty or "date" not in data.columns:
-        return go.Figure().update_layout(title="Données insuffisantes")
-    if len(data["date"].dropna().unique()) < 2:
-        return go.Figure().update_layout(title="Pas assez de périodes")
-
-    time_data = data.groupby("date").size().reset_index(name="count")
-    time_data = time_data.sort_values("date")
+def create_origin_notifier_heatmap(matrix: pd.DataFrame) -> go.Figure:
+    import plotly.express as px
+
+    if matrix is None or matrix.empty:
+        return _empty_figure("Données insuffisantes pour la heatmap")
+
+    fig = px.imshow(
+        matrix,
+        labels=dict(x="Pays notifiant", y="Pays d'origine", color="Nombre"),
+        color_continuous_scale=px.colors.sequential.Blues,
+        title="Relations pays d'origine / pays notifiant",
+    )
+    fig.update_layout(xaxis={"tickangle": 45}, height=600)
+    return fig
+
+
+def create_timeline_chart(counts: pd.Series) -> go.Figure:
+    import plotly.express as px
+
+    if counts is None or counts.empty:
+        return _empty_figure("Données insuffisantes")
+    if len(counts) < 2:
+        return _empty_figure("Pas assez de périodes")
+
+    time_data = counts.sort_index().rename_axis("date").reset_index(name="count")
 
     fig = px.line(
         time_data,
@@ -148,19 +132,20 @@ def create_timeline_chart(data: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def create_timeline_by_fraud_type(data: pd.DataFrame) -> go.Figure:
-    if (
-        data is None
-        or data.empty
-        or "date" not in data.columns
-        or "fraud_type" not in data.columns
-    ):
-        return go.Figure().update_layout(title="Données insuffisantes")
-    if len(data["date"].dropna().unique()) < 2:
-        return go.Figure().update_layout(title="Pas assez de périodes")
+def create_timeline_by_fraud_type(matrix: pd.DataFrame) -> go.Figure:
+    import plotly.express as px
 
-    time_data = data.groupby(["date", "fraud_type"]).size().reset_index(name="count")
-    time_data = time_data.sort_values("date")
+    if matrix is None or matrix.empty:
+        return _empty_figure("Données insuffisantes")
+    if len(matrix) < 2:
+        return _empty_figure("Pas assez de périodes")
+
+    time_data = (
+        matrix.sort_index()
+        .rename_axis(index="date", columns="fraud_type")
+        .stack()
+        .reset_index(name="count")
+    )
 
     fig = px.line(
         time_data,
@@ -175,16 +160,13 @@ def create_timeline_by_fraud_type(data: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def create_fraud_category_chart(data: pd.DataFrame) -> go.Figure:
-    if data is None or data.empty or "fraud_type" not in data.columns:
-        return go.Figure().update_layout(title="Données insuffisantes")
+def create_fraud_category_chart(counts: pd.Series) -> go.Figure:
+    import plotly.express as px
 
-    from utils import categorize_fraud_issue
+    if counts is None or counts.empty:
+        return _empty_figure("Données insuffisantes")
 
-    data_copy = data.copy()
-    data_copy["fraud_category"] = data_copy["issue"].apply(categorize_fraud_issue)
-    cat_counts = data_copy["fraud_category"].value_counts().reset_index()
-    cat_counts.columns = ["category", "count"]
+    cat_counts = counts.rename_axis("category").reset_index(name="count")
 
     fig = px.bar(
         cat_counts,
@@ -198,3 +180,88 @@ def create_fraud_category_chart(data: pd.DataFrame) -> go.Figure:
     fig.update_coloraxes(showscale=False)
     fig.update_layout(xaxis={"tickangle": 30})
     return fig
+
+
+CHART_BUILDERS = {
+    "category": create_fraud_by_category_chart,
+    "fraud_type": create_fraud_by_type_chart,
+    "choropleth": create_country_choropleth,
+    "heatmap": create_origin_notifier_heatmap,
+    "timeline": create_timeline_chart,
+    "timeline_by_type": create_timeline_by_fraud_type,
+    "fraud_category": create_fraud_category_chart,
+}
+
+
+def data_fingerprint(data_generation: str, filters: dict, **extra) -> str:
+    state = json.dumps([data_generation, filters, extra], sort_keys=True, default=str)
+    return hashlib.sha1(state.encode()).hexdigest()
+
+
+def cached_figure(kind: str, table, fingerprint: str, **params) -> go.Figure:
+    import plotly.io as pio
+
+    key = (kind, tuple(sorted(params.items())), fingerprint)
+    with _figure_cache_lock:
+        spec = _figure_cache.get(key)
+        if spec is not None:
+            _figure_cache.move_to_end(key)
+            _figure_cache_stats["hits"] += 1
+        else:
+            _figure_cache_stats["misses"] += 1
+
+    if spec is None:
+        if callable(table):
+            table = table()
+        spec = CHART_BUILDERS[kind](table, **params).to_json()
+        with _figure_cache_lock:
+            _figure_cache[key] = spec
+            while len(_figure_cache) > FIGURE_CACHE_SIZE:
+                _figure_cache.popitem(last=False)
+                _figure_cache_stats["evictions"] += 1
+    return pio.from_json(spec)
+
+
+VIEWS = {
+    "top_categories": (
+        "category",
+        lambda dm, data: count_values(data["product_category"], top_n=15),
+    ),
+    "fraud_types": (
+        "fraud_type",
+        lambda dm, data: count_values(data["fraud_type"], top_n=10),
+    ),
+    "fraud_categories": (
+        "fraud_category",
+        lambda dm, data: count_values(data["fraud_category"]),
+    ),
+    "origins_map": ("choropleth", lambda dm, data: count_by_country(data)),
+    "origin_notifier": (
+        "heatmap",
+        lambda dm, data: dm.pivot(
+            data, "origin", "notified_by", top_rows=15, top_cols=10
+        ),
+    ),
+    "timeline": ("timeline", lambda dm, data: count_values(data["date"])),
+    "timeline_by_type": (
+        "timeline_by_type",
+        lambda dm, data: dm.pivot(data, "date", "fraud_type", top_cols=8),
+    ),
+}
+
+
+def view_figure(dm, view: str, data: pd.DataFrame, filters: dict) -> go.Figure:
+    kind, table = VIEWS[view]
+    return cached_figure(
+        kind,
+        lambda: table(dm, data),
+        data_fingerprint(dm.generation_of(data), filters, view=view),
+    )
+
+
+def figure_cache_info() -> dict:
+    with _figure_cache_lock:
+        info = dict(_figure_cache_stats, entries=len(_figure_cache))
+    lookups = info["hits"] + info["misses"]
+    info["hit_rate"] = info["hits"] / lookups if lookups else 0.0
+    return info
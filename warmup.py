@@ -0,0 +1,74 @@
+import time
+import logging
+import threading
+
+from db_adapter import DataManager
+
+logger = logging.getLogger(__name__)
+
+WARMUP_CODE_COLUMNS = [
+    "date",
+    "origin",
+    "notified_by",
+    "product_category",
+    "fraud_type",
+]
+
+_lock = threading.Lock()
+_ready = threading.Event()
+_thread: threading.Thread | None = None
+_manager: DataManager | None = None
+_error: str | None = None
+
+
+def _warm_up() -> None:
+    global _manager, _error
+    from visualizations import VIEWS, view_figure
+
+    started = time.perf_counter()
+    try:
+        dm = DataManager()
+        dm.get_kpi_snapshot()
+        for column in WARMUP_CODE_COLUMNS:
+            dm.label_codes(column)
+        filters = dm.default_filters()
+        filtered = dm.filter_data(**filters)
+        if not filtered.empty:
+            for view in VIEWS:
+                view_figure(dm, view, filtered, filters)
+        _manager = dm
+        logger.info(
+            "Préchauffage terminé en %.1fs (%d lignes, %d vues)",
+            time.perf_counter() - started,
+            len(dm.data),
+            len(VIEWS),
+        )
+    except Exception as e:
+        logger.error("Échec du préchauffage: %s", e)
+        _error = str(e)
+    finally:
+        _ready.set()
+
+
+def start() -> None:
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_warm_up, name="warmup", daemon=True)
+            _thread.start()
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def get_data_manager(timeout: float | None = None) -> DataManager:
+    global _manager
+    start()
+    if not _ready.wait(timeout):
+        raise TimeoutError("Préchauffage toujours en cours")
+    with _lock:
+        if _manager is None:
+            logger.warning("Préchauffage en échec (%s), chargement direct", _error)
+            _manager = DataManager()
+    return _manager